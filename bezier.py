@@ -1,8 +1,10 @@
 
 
+import math
+from functools import cached_property
 from typing import TYPE_CHECKING
 
-from vec import Vec
+from vec import Vec, VecArray
 import svg
 from line import Line
 import numpy
@@ -11,47 +13,101 @@ if TYPE_CHECKING:
     from matrix import Matrix
 
 class Bezier:
-    def __init__(self, control_points: list[Vec]):
+    def __init__(self, control_points: list[Vec] | VecArray):
         self.control_points = control_points
 
     @property
     def order(self):
         return len(self.control_points)-1
 
-    def _b(self, i: int, j: int, t: float) -> Vec:
-        if j == 0:
-            return self.control_points[i]
-        return self._b(i, j - 1, t)*(1 - t) + self._b(i + 1, j - 1, t)*t
+    def __repr__(self):
+        return f"Bezier({list(self.control_points)})"
+
+    @cached_property
+    def bounds(self) -> tuple[float, float, float, float]:
+        # Box around the control points, which always contains the curve.
+        xs = [v.x for v in self.control_points]
+        ys = [v.y for v in self.control_points]
+        return (min(xs), min(ys), max(xs), max(ys))
+
+    def _de_casteljau(self, t: float) -> list[list[Vec]]:
+        # Each round lerps neighbouring points of the previous one, ending
+        # with the single point on the curve at t.
+        rounds = [list(self.control_points)]
+        for _ in range(self.order):
+            points = rounds[-1]
+            rounds.append([a * (1 - t) + b * t for a, b in zip(points, points[1:])])
+        return rounds
 
     def at(self, t):
-        return self._b(0, self.order, t)
-    
+        return self._de_casteljau(t)[-1][0]
+
+    def at_many(self, ts) -> VecArray:
+        """Evaluates the curve at every t in ts with one Bernstein matrix product."""
+        ts = numpy.asarray(ts, dtype=numpy.float64)
+        n = self.order
+        k = numpy.arange(n + 1)
+        basis = (
+            numpy.array([math.comb(n, i) for i in k], dtype=numpy.float64)
+            * ts[:, None] ** k
+            * (1 - ts[:, None]) ** (n - k)
+        )
+        points = (
+            self.control_points
+            if type(self.control_points) is VecArray
+            else VecArray.from_vecs(self.control_points)
+        )
+        return VecArray(basis @ points.data)
+
     def split_at(self, t: float):
+        rounds = self._de_casteljau(t)
         return (
-            Bezier([self._b(0, i, t) for i in range(self.order + 1)]),
-            Bezier([self._b(i, self.order - i, t) for i in range(self.order + 1)]),
+            Bezier([points[0] for points in rounds]),
+            Bezier([points[-1] for points in reversed(rounds)]),
+        )
+
+    def segment(self, t0: float, t1: float) -> "Bezier":
+        """The part of the curve between t0 and t1."""
+        if t1 < 1:
+            curve = self.split_at(t1)[0]
+            t0 = t0 / t1
+        else:
+            curve = self
+        return curve.split_at(t0)[1] if t0 > 0 else curve
+
+    def _line_coefficients(self, normals: numpy.ndarray, ds: numpy.ndarray):
+        # Cubic in t (lowest power first) of normal.dot(at(t)) - d, one row per line.
+        points = (
+            self.control_points
+            if type(self.control_points) is VecArray
+            else VecArray.from_vecs(self.control_points)
+        )
+        dots = normals @ points.data.T
+        return numpy.stack(
+            [
+                dots[:, 0] - ds,
+                -3 * dots[:, 0] + 3 * dots[:, 1],
+                3 * dots[:, 0] - 6 * dots[:, 1] + 3 * dots[:, 2],
+                -dots[:, 0] + 3 * dots[:, 1] - 3 * dots[:, 2] + dots[:, 3],
+            ],
+            axis=1,
         )
-    
-    def intersections(self, line: Line):
-        vec, d = line.as_vec_d()
-        dots = [vec.dot(v) for v in self.control_points]
-        coefficients = [
-            1*dots[0]-d,
-            -3*dots[0] + 3*dots[1],
-            3*dots[0] + -6*dots[1] + 3* dots[2],
-            -1*dots[0] + 3*dots[1] + -3*dots[2] + 1*dots[3]
-        ]
-        """coefficients = [0, 0, 0, -d]
-        coefficients += [-1, 3, -3, 1] * self.control_points[0].dot(vec)
-        coefficients += [3, -6, 3, 0] * self.control_points[1].dot(vec)
-        coefficients += [-3, 3, 0, 0] * self.control_points[2].dot(vec)
-        coefficients += [1, 0, 0, 0] * self.control_points[3].dot(vec)"""
-        p = numpy.polynomial.polynomial.Polynomial(coefficients)
-        #p.domain = [0., 1.]
-        roots = p.roots()
-        return [complex(r).real for r in roots if complex(r).real >= 0 and complex(r).real <= 1 and complex(r).imag < 0.01 and complex(r).imag > -0.01]
 
+    def intersections(self, line: Line) -> list[float]:
+        """Sorted curve parameters in [0, 1] where the (cubic) curve crosses line."""
+        return self.intersections_many([line])[0]
 
+    def intersections_many(self, lines: list[Line]) -> list[list[float]]:
+        """intersections() against every line at once."""
+        if not lines:
+            return []
+        normals, ds = zip(*(line.as_vec_d() for line in lines))
+        coefficients = self._line_coefficients(
+            numpy.array(normals, dtype=numpy.float64),
+            numpy.array(ds, dtype=numpy.float64),
+        )
+        roots = _unit_interval_roots(coefficients)
+        return [sorted({r for r in row if not math.isnan(r)}) for row in roots.tolist()]
 
     def _render(self, width, t : "Matrix"):
         #Only cubic implemented.
@@ -62,8 +118,80 @@ class Bezier:
                 svg.CubicBezier(
                     **(t * (self.control_points[1])).v1,
                     **(t * (self.control_points[2])).v2,
-                    **(t * (self.control_points[3])),
+                    **(t * (self.control_points[3])).xy,
                 ),
             ],
         )
 
+
+def _unit_interval_roots(coefficients: numpy.ndarray) -> numpy.ndarray:
+    """Roots in [0, 1] of c0 + c1 t + c2 t^2 + c3 t^3 for each row of
+    coefficients, as an (n, 3) array padded with nan.
+
+    [0, 1] is cut at the polynomial's turning points into pieces it is
+    monotonic on, so each piece holds at most one root. A root is bracketed
+    by a sign change over its piece and found by _bracketed_root. Unlike a
+    closed-form solution, this stays right when the cubic term is small but
+    not negligible.
+    """
+    c0, c1, c2, c3 = (c[:, None] for c in coefficients.T)
+
+    def f(t):
+        return ((c3 * t + c2) * t + c1) * t + c0
+
+    with numpy.errstate(all="ignore"):
+        # Turning points solve 3 c3 t^2 + 2 c2 t + c1 = 0. This form of the
+        # quadratic formula avoids cancellation, and as c3 goes to 0 one root
+        # goes off to infinity while the other tends to -c1 / (2 c2).
+        a, b = 3 * c3, 2 * c2
+        disc = b * b - 4 * a * c1
+        q = -0.5 * (b + numpy.copysign(numpy.sqrt(disc), b))
+        turning = numpy.concatenate([q / a, c1 / q], axis=1)
+        turning[~((turning > 0) & (turning < 1))] = numpy.nan
+        ones = numpy.ones_like(c0)
+        # nan sorts last, so each row is 0, the turning points, 1, then nan.
+        edges = numpy.sort(numpy.concatenate([0 * ones, turning, ones], axis=1))
+        lo, hi = edges[:, :3], edges[:, 1:]
+        f_lo, f_hi = f(lo), f(hi)
+
+    roots = numpy.full(lo.shape, numpy.nan)
+    # Roots on a turning point are taken as the start of the next piece, so
+    # they are only found once.
+    at_lo = f_lo == 0
+    roots[at_lo] = lo[at_lo]
+    roots[(hi == 1) & (f_hi == 0) & ~at_lo] = 1.0
+    # Only a few pieces per call hold a crossing, few enough that solving
+    # them one at a time beats more rounds of array operations.
+    for row, piece in zip(*numpy.nonzero(f_lo * f_hi < 0)):
+        roots[row, piece] = _bracketed_root(
+            coefficients[row].tolist(), float(lo[row, piece]), float(hi[row, piece])
+        )
+    # A polynomial that is zero everywhere (the curve lies on the line) has
+    # no isolated crossings.
+    roots[~numpy.any(coefficients, axis=1)] = numpy.nan
+    return roots
+
+
+def _bracketed_root(coefficients: list[float], lo: float, hi: float) -> float:
+    """The root of a cubic between lo and hi, where it changes sign. Newton
+    steps, falling back to bisection whenever a step would leave the bracket,
+    which shrinks around the root as it goes."""
+    c0, c1, c2, c3 = coefficients
+    rising = ((c3 * hi + c2) * hi + c1) * hi > ((c3 * lo + c2) * lo + c1) * lo
+    t = 0.5 * (lo + hi)
+    for _ in range(60):
+        f = ((c3 * t + c2) * t + c1) * t + c0
+        if (f < 0) == rising:
+            lo = t
+        else:
+            hi = t
+        df = (3 * c3 * t + 2 * c2) * t + c1
+        step = t - f / df if df else 0.5 * (lo + hi)
+        if not lo <= step <= hi:
+            step = 0.5 * (lo + hi)
+        # Newton converges quadratically, so a step this small leaves t
+        # accurate to the last few bits.
+        if abs(step - t) < 1e-9:
+            return step
+        t = step
+    return t
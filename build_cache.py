@@ -0,0 +1,121 @@
+import ast
+import hashlib
+import json
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+
+def _module_path(module: str) -> Path | None:
+    path = ROOT.joinpath(*module.split(".")).with_suffix(".py")
+    return path if path.exists() else None
+
+
+def _is_sheet(node: ast.stmt) -> bool:
+    return isinstance(node, ast.FunctionDef) and any(
+        isinstance(d, ast.Call) and getattr(d.func, "id", None) == "sheet"
+        for d in node.decorator_list
+    )
+
+
+class _SourceFile:
+    def __init__(self, path: Path):
+        source = path.read_bytes()
+        self.digest = hashlib.sha1(source).hexdigest()
+        self.tree = ast.parse(source)
+        self.imports = set()
+        for node in ast.walk(self.tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0:
+                names = [node.module]
+                names += [f"{node.module}.{alias.name}" for alias in node.names]
+            else:
+                continue
+            self.imports.update(filter(None, map(_module_path, names)))
+
+
+class BuildCache:
+    """Fingerprints of the inputs each target was last built from, so targets
+    whose inputs haven't changed can be skipped.
+
+    A fingerprint covers the target's own code, every repo module it imports
+    (directly or not), where it writes and the build options. For sheets
+    sharing a module, the other @sheet functions are left out of the code, so
+    editing one sheet doesn't rebuild the rest. Comments and formatting are
+    ignored in the target's own module but not in its imports. Entries are
+    kept as JSON at path, along with the files each target wrote, and a
+    target is rebuilt if any of those files has gone missing.
+    """
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._entries: dict[str, dict] = {}
+        # Parsed source files, keyed by path and checked against its stat.
+        self._sources: dict[Path, tuple[tuple, _SourceFile]] = {}
+        if path.exists():
+            with open(path) as f:
+                self._entries = json.load(f)
+
+    def _source(self, path: Path) -> _SourceFile:
+        stat = path.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+        if path not in self._sources or self._sources[path][0] != key:
+            self._sources[path] = (key, _SourceFile(path))
+        return self._sources[path][1]
+
+    def dependencies(self, path: Path) -> list[Path]:
+        """Repo modules imported by the module at path, directly or not."""
+        seen = {path}
+        pending = [path]
+        while pending:
+            for dependency in self._source(pending.pop()).imports - seen:
+                seen.add(dependency)
+                pending.append(dependency)
+        return sorted(seen - {path})
+
+    def fingerprint(self, target, options: dict) -> str:
+        path = _module_path(target.module)
+        source = self._source(path)
+        tree = ast.Module(
+            [
+                node
+                for node in source.tree.body
+                if not _is_sheet(node) or node.name == target.function
+            ],
+            [],
+        )
+        return hashlib.sha1(
+            repr(
+                (
+                    target.module,
+                    target.function,
+                    str(target.folder),
+                    target.model_name,
+                    sorted(options.items()),
+                    ast.unparse(tree),
+                    [
+                        (str(d.relative_to(ROOT)), self._source(d).digest)
+                        for d in self.dependencies(path)
+                    ],
+                )
+            ).encode()
+        ).hexdigest()
+
+    def is_fresh(self, name: str, fingerprint: str) -> bool:
+        entry = self._entries.get(name)
+        return (
+            entry is not None
+            and entry["fingerprint"] == fingerprint
+            and all(Path(output).exists() for output in entry["outputs"])
+        )
+
+    def record(self, name: str, fingerprint: str, outputs: list[str]):
+        self._entries[name] = {"fingerprint": fingerprint, "outputs": outputs}
+
+    def forget(self, name: str):
+        self._entries.pop(name, None)
+
+    def save(self):
+        with open(self._path, "w") as f:
+            json.dump(self._entries, f, indent=1, sort_keys=True)
@@ -1,16 +1,46 @@
+import copy
+import hashlib
 import math
+import numpy
 import svg
 from matrix import *
 from vec import Vec
-from line import Line, lerp
-from sheets import BaseUnit
+from collections import Counter
+from functools import cached_property, wraps
+from line import Line, boxes_overlap, lerp
+from sheets import BaseUnit, sheet_defaults, svg_transform
+from render_cache import structural_hash
 from bezier import Bezier
+from tracing import element_count, traced, tracer
+
+# How many zone clips ran the exact edge intersection code, how many were
+# rejected by bounding boxes first, and how many zone tree branches were
+# skipped without visiting their zones.
+clip_stats = Counter(exact=0, culled=0, pruned=0)
 
 
 class TransformStackZone:
     def __init__(self, initial_verts, transform):
         self.transform = transform
         self.verts = list(initial_verts)
+        self.bounds = (
+            min(v.x for v in self.verts),
+            min(v.y for v in self.verts),
+            max(v.x for v in self.verts),
+            max(v.y for v in self.verts),
+        )
+
+    @cached_property
+    def design_bounds(self) -> tuple[float, float, float, float]:
+        # Box around the zone pulled back through its transform, i.e. the area
+        # of the unfolded design that lands in this zone.
+        verts = self.transform.inverse().apply_many(self.verts)
+        return (
+            float(verts.x.min()),
+            float(verts.y.min()),
+            float(verts.x.max()),
+            float(verts.y.max()),
+        )
 
     @property
     def edges(self):
@@ -21,6 +51,11 @@ class TransformStackZone:
     def clip_line_and_split(
         self, line, unfolded_tangent
     ) -> tuple[Line | None, list["TransformStackZone"]]:
+        if line.misses_box(self.bounds):
+            clip_stats["culled"] += 1
+            return None, [self]
+        clip_stats["exact"] += 1
+
         current_segment_verts = []
         other_segment_verts = []
         intersection_verts = []
@@ -54,6 +89,11 @@ class TransformStackZone:
         return None, [self]
 
     def clip_line(self, line) -> Line | None:
+        if not boxes_overlap(line.bounds, self.bounds) or line.misses_box(self.bounds):
+            clip_stats["culled"] += 1
+            return None
+        clip_stats["exact"] += 1
+
         intersection_verts = []
         for edge in self.edges:
             intersect = edge.intersection(line)
@@ -78,30 +118,34 @@ class TransformStackZone:
         return None
 
     def clip_bezier(self, bezier: Bezier) -> list[Bezier]:
-        all_curves = [bezier]
-        for edge in self.edges:
-            clipped_curves = []
-            for curve in all_curves:
-                intercepts = curve.intersections(edge)
-                current_segment = curve
-                last_intercept = 0.0
-                for intercept in intercepts:
-                    before, after = current_segment.split_at(
-                        (intercept - last_intercept) / (1 - last_intercept)
-                    )
-                    last_intercept = intercept
-                    clipped_curves.append(before)
-                    current_segment = after
-                clipped_curves.append(current_segment)
-            all_curves = [
-                c for c in clipped_curves if (c.at(0.5) - edge.v1).dot(edge.tangent) < 0
-            ]
-        return all_curves
+        return [bezier.segment(t0, t1) for t0, t1 in self.clip_bezier_spans(bezier)]
+
+    def clip_bezier_spans(self, bezier: Bezier) -> list[tuple[float, float]]:
+        # Works in the curve's own parameter: split [0, 1] at every crossing
+        # with any edge line, then keep the spans whose midpoint is inside.
+        if not boxes_overlap(bezier.bounds, self.bounds):
+            clip_stats["culled"] += 1
+            return []
+        clip_stats["exact"] += 1
+
+        edges = self.edges
+        cuts = sorted(
+            {0.0, 1.0, *(t for ts in bezier.intersections_many(edges) for t in ts)}
+        )
+        spans = [(t0, t1) for t0, t1 in zip(cuts, cuts[1:]) if t1 - t0 > 1e-9]
+        if not spans:
+            return []
+        midpoints = bezier.at_many([(t0 + t1) * 0.5 for t0, t1 in spans])
+        inside = numpy.ones(len(spans), dtype=bool)
+        for edge in edges:
+            inside &= (midpoints - edge.v1).dot(edge.tangent) < 0
+        return [span for span, keep in zip(spans, inside.tolist()) if keep]
 
 
 class CreaseLine:
-    def __init__(self, line: Line):
+    def __init__(self, line: Line, symmetry: tuple[int, int] = (0, 1)):
         self.line = line
+        self.symmetry = symmetry
 
     def render_elements(self, width: float, t: Matrix, with_hints=False):
         transformed_line = Line(self.line.v1 * width, self.line.v2 * width)
@@ -109,8 +153,19 @@ class CreaseLine:
 
 
 class CreaseBezier:
-    def __init__(self, bezier: Bezier):
+    def __init__(
+        self,
+        bezier: Bezier,
+        source: Bezier | None = None,
+        span: tuple[float, float] | None = None,
+        symmetry: tuple[int, int] = (0, 1),
+    ):
+        # source/span: the curve this piece was clipped from, and the
+        # parameter range it covers, so neighbouring pieces can be rejoined.
         self.bezier = bezier
+        self.source = source or bezier
+        self.span = span or (0.0, 1.0)
+        self.symmetry = symmetry
 
     def render_elements(self, width: float, t: Matrix, with_hints=False):
         transformed_bezier: Bezier = t * Bezier(
@@ -137,30 +192,270 @@ class CreaseBezier:
                 svg.CubicBezier(
                     **transformed_bezier.control_points[1].v1,
                     **transformed_bezier.control_points[2].v2,
-                    **transformed_bezier.control_points[3],
+                    **transformed_bezier.control_points[3].xy,
                 ),
             ],
         )
 
 
+class ZoneNode:
+    """Node of a TransformStackUnit's zone tree, a bounding box hierarchy.
+    Leaves hold a zone. A fold that splits a leaf's zone replaces the leaf
+    with a branch that has the unfolded and folded zones as children. Nodes
+    are never modified, folding builds new nodes along the changed paths.
+
+    bounds covers the design space area of every zone below the node, so a
+    crease only needs to visit the branches whose bounds it touches. The fold
+    lines themselves can't prune: a later fold can carry part of a branch
+    back across the line that made it.
+    """
+
+    def __init__(
+        self,
+        zone: TransformStackZone | None = None,
+        children: tuple["ZoneNode", ...] = (),
+    ):
+        self.zone = zone
+        self.children = children
+        if zone:
+            self.bounds = zone.design_bounds
+        else:
+            boxes = [child.bounds for child in children]
+            self.bounds = (
+                min(b[0] for b in boxes),
+                min(b[1] for b in boxes),
+                max(b[2] for b in boxes),
+                max(b[3] for b in boxes),
+            )
+
+    def zones(self):
+        if self.zone:
+            yield self.zone
+        for child in self.children:
+            yield from child.zones()
+
+    def zones_touching(self, touches):
+        """Zones, in order, below every branch whose bounds pass touches()."""
+        if not touches(self.bounds):
+            clip_stats["pruned"] += 1
+            return
+        if self.zone:
+            yield self.zone
+        for child in self.children:
+            yield from child.zones_touching(touches)
+
+    def map_zones(self, touches, replace) -> "ZoneNode":
+        """Tree with replace(zone) substituted for every zone passing
+        touches(). replace returns either the zone itself or the zones to
+        split it into."""
+        if not touches(self.bounds):
+            clip_stats["pruned"] += 1
+            return self
+        if self.zone:
+            replacement = replace(self.zone)
+            if replacement is self.zone:
+                return self
+            return ZoneNode(children=tuple(ZoneNode(z) for z in replacement))
+        children = tuple(child.map_zones(touches, replace) for child in self.children)
+        if all(new is old for new, old in zip(children, self.children)):
+            return self
+        return ZoneNode(children=children)
+
+
+class CreaseList:
+    """Append-only list of a unit's crease elements, which can share its
+    contents with a forked copy. fork() freezes the items added so far into a
+    chunk that both lists then read from, so forking copies no elements and
+    later appends stay private to each list."""
+
+    def __init__(self, frozen: tuple[list, ...] = (), frozen_len: int = 0):
+        self._frozen = frozen
+        self._frozen_len = frozen_len
+        self._items = []
+
+    def append(self, element):
+        self._items.append(element)
+
+    def __iadd__(self, elements):
+        self._items += elements
+        return self
+
+    def __len__(self):
+        return self._frozen_len + len(self._items)
+
+    def __iter__(self):
+        for chunk in self._frozen:
+            yield from chunk
+        yield from self._items
+
+    def truncate(self, length: int):
+        if length >= self._frozen_len:
+            del self._items[length - self._frozen_len :]
+            return
+        # Frozen chunks may be shared, so keep whole ones and copy the part
+        # of the last one that survives.
+        frozen = []
+        remaining = length
+        for chunk in self._frozen:
+            if remaining <= 0:
+                break
+            frozen.append(chunk if len(chunk) <= remaining else chunk[:remaining])
+            remaining -= len(chunk)
+        self._frozen = tuple(frozen)
+        self._frozen_len = length
+        self._items = []
+
+    def fork(self) -> "CreaseList":
+        if self._items:
+            self._frozen += (self._items,)
+            self._frozen_len += len(self._items)
+            self._items = []
+        return CreaseList(self._frozen, self._frozen_len)
+
+
+class Operation:
+    """One recorded add_* call on a TransformStackUnit."""
+
+    def __init__(self, name: str, args: tuple, kwargs: dict):
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+
+    def __repr__(self):
+        args = [repr(a) for a in self.args]
+        args += [f"{k}={v!r}" for k, v in self.kwargs.items()]
+        return f"{self.name}({', '.join(args)})"
+
+
+def _operation(method):
+    # Records the call in unit.operations and snapshots the state after it.
+    # A call that raises is undone and not recorded.
+    @wraps(method)
+    def record(self, *args, **kwargs):
+        self._merged_elements = None
+        try:
+            with tracer.span(method.__qualname__):
+                method(self, *args, **kwargs)
+        except BaseException:
+            self._restore(self._snapshots[-1])
+            raise
+        self.operations.append(Operation(method.__name__, args, kwargs))
+        self._snapshots.append(self._state())
+
+    return record
+
+
 # Intended to be built up over several steps.
 class TransformStackUnit(BaseUnit):
-    def __init__(self, length_ratio: float, initial_transform: Matrix | None = None):
+    # Render creases through merge_collinear_creases
+    merge_creases = True
+
+    def __init__(
+        self,
+        length_ratio: float,
+        initial_transform: Matrix | None = None,
+        fundamental_domain: bool | None = None,
+    ):
+        """fundamental_domain: only compute and render the creases of the
+        identity symmetry, and place the symmetric copies with <use>. Folds
+        still split zones for every symmetry, as later creases depend on it."""
         # Could allow non-rectangles?
-        self.zones = [
+        self.zone_tree = ZoneNode(
             TransformStackZone(
                 [Vec(0, 0), Vec(1, 0), Vec(1, length_ratio), Vec(0, length_ratio)],
                 initial_transform or identity(),
             )
-        ]
+        )
         self.symmetries = [identity()]
-        self.elements = []
+        self.elements = CreaseList()
         self.length_ratio = length_ratio
+        self.initial_transform = initial_transform
+        self.fundamental_domain = (
+            sheet_defaults.fundamental_domain
+            if fundamental_domain is None
+            else fundamental_domain
+        )
+        self._merged_elements = None
+        # _snapshots[i] is the state before operations[i] (and the last one is
+        # the current state), so an edited step can replay from its snapshot.
+        self.operations: list[Operation] = []
+        self._snapshots = [self._state()]
+
+    def structural_hash(self) -> str:
+        return structural_hash(
+            "TransformStackUnit",
+            self.length_ratio,
+            self.initial_transform,
+            self.fundamental_domain,
+            self.merge_creases,
+            self.operations,
+        )
+
+    @property
+    def zones(self) -> list[TransformStackZone]:
+        return list(self.zone_tree.zones())
+
+    def _state(self):
+        # Zone trees are never modified in place and elements are only
+        # appended, so a snapshot just needs references and a length.
+        return self.zone_tree, tuple(self.symmetries), len(self.elements)
+
+    def fork(self) -> "TransformStackUnit":
+        """Copy of this unit for trying out variants. The copy shares the
+        zone tree, symmetries, creases and operation history built so far, and
+        only the operations applied to either unit afterwards cost anything."""
+        child = copy.copy(self)
+        child.symmetries = list(self.symmetries)
+        child.elements = self.elements.fork()
+        child.operations = list(self.operations)
+        child._snapshots = list(self._snapshots)
+        return child
+
+    def _restore(self, snapshot):
+        self._merged_elements = None
+        zone_tree, symmetries, element_count = snapshot
+        self.zone_tree = zone_tree
+        self.symmetries = list(symmetries)
+        self.elements.truncate(element_count)
+
+    def update_operation(self, index: int, *args, **kwargs):
+        """Replaces the arguments of operations[index] and re-runs it and every
+        later operation, starting from the state saved before it. If that
+        raises, the unit is left as it was."""
+        operations = list(self.operations)
+        self.operations[index] = Operation(operations[index].name, args, kwargs)
+        self._replay_or_revert(index, operations)
+
+    def remove_operation(self, index: int):
+        operations = list(self.operations)
+        del self.operations[index]
+        self._replay_or_revert(index, operations)
+
+    def _replay_or_revert(self, index: int, operations: list[Operation]):
+        try:
+            self.replay_from(index)
+        except BaseException:
+            self.operations = operations
+            self.replay_from(index)
+            raise
+
+    def replay_from(self, index: int):
+        self._restore(self._snapshots[index])
+        del self._snapshots[index + 1 :]
+        for operation in self.operations[index:]:
+            method = getattr(TransformStackUnit, operation.name).__wrapped__
+            method(self, *operation.args, **operation.kwargs)
+            self._snapshots.append(self._state())
+
+    def _crease_symmetries(self) -> list[Matrix]:
+        # Symmetries to compute creases for when they don't change the zones.
+        return self.symmetries[:1] if self.fundamental_domain else self.symmetries
 
-    #
+    @_operation
     def add_rotational_symmetry(self, point: Vec):
         self.symmetries += [rotate_around_point(point, 180)]
 
+    @_operation
     def add_fold(
         self, line: Line, unfolded_point
     ):  # direction means which part is being flipped
@@ -168,12 +463,11 @@ class TransformStackUnit(BaseUnit):
         if unfolded_tangent.dot(unfolded_point - line.v1) < 0:
             unfolded_tangent = -unfolded_tangent
 
-        for symmetry in self.symmetries:
+        for index, symmetry in enumerate(self.symmetries):
             symm_line = symmetry * line
             symm_unfolded_tangent = symmetry.multiply_direction(unfolded_tangent)
 
-            new_zones = []
-            for zone in self.zones:
+            def split(zone: TransformStackZone):
                 transformed_line = zone.transform * symm_line
                 transformed_unfolded_tangent = zone.transform.multiply_direction(
                     symm_unfolded_tangent
@@ -181,37 +475,219 @@ class TransformStackUnit(BaseUnit):
                 line_segment, split_zones = zone.clip_line_and_split(
                     transformed_line, transformed_unfolded_tangent
                 )
-                new_zones += split_zones
                 if line_segment:
-                    self.elements.append(CreaseLine(line_segment))
-            self.zones = new_zones
+                    self.elements.append(
+                        CreaseLine(line_segment, (index, len(self.symmetries)))
+                    )
+                    return split_zones
+                return zone
+
+            self.zone_tree = self.zone_tree.map_zones(
+                lambda bounds: not symm_line.misses_box(bounds), split
+            )
 
+    @_operation
     def add_simple_fold(
         self, line: Line
     ):  # direction means which part is being flipped
-        for symmetry in self.symmetries:
+        for index, symmetry in enumerate(self._crease_symmetries()):
             symm_line = symmetry * line
 
-            for zone in self.zones:
+            for zone in self.zone_tree.zones_touching(
+                lambda bounds: boxes_overlap(symm_line.bounds, bounds)
+                and not symm_line.misses_box(bounds)
+            ):
                 transformed_line = zone.transform * symm_line
                 line_segment = zone.clip_line(transformed_line)
                 if line_segment:
-                    self.elements.append(CreaseLine(line_segment))
+                    self.elements.append(
+                        CreaseLine(line_segment, (index, len(self.symmetries)))
+                    )
 
+    @_operation
     def add_bezier_crease(self, bezier: Bezier):
-        for symmetry in self.symmetries:
+        for index, symmetry in enumerate(self._crease_symmetries()):
             symm_bezier = symmetry * bezier
-            for zone in self.zones:
+            for zone in self.zone_tree.zones_touching(
+                lambda bounds: boxes_overlap(symm_bezier.bounds, bounds)
+            ):
+                transformed_bezier = zone.transform * symm_bezier
                 self.elements += [
-                    CreaseBezier(segment)
-                    for segment in zone.clip_bezier(zone.transform * symm_bezier)
+                    CreaseBezier(
+                        transformed_bezier.segment(t0, t1),
+                        transformed_bezier,
+                        (t0, t1),
+                        (index, len(self.symmetries)),
+                    )
+                    for t0, t1 in zone.clip_bezier_spans(transformed_bezier)
                 ]
 
-    def render_elements(self, width: float, t: Matrix, with_hints=False) -> list:
+    def merged_elements(self) -> list:
+        if self._merged_elements is None:
+            elements = list(self.elements)
+            if self.fundamental_domain:
+                elements = [e for e in elements if e.symmetry[0] == 0]
+            self._merged_elements = (
+                merge_collinear_creases(elements) if self.merge_creases else elements
+            )
+        return self._merged_elements
+
+    def paper_symmetries(self, count: int) -> list[Matrix]:
+        """The first count symmetries as transforms of the unit's paper space
+        (where creases live) rather than its design space."""
+        if not self.initial_transform:
+            return self.symmetries[:count]
+        inverse = self.initial_transform.inverse()
         return [
-            element.render_elements(width, t, with_hints) for element in self.elements
+            self.initial_transform @ symmetry @ inverse
+            for symmetry in self.symmetries[:count]
         ]
 
+    @traced(count=element_count)
+    def render_elements(self, width: float, t: Matrix, with_hints=False) -> list:
+        if not self.fundamental_domain:
+            return [
+                element.render_elements(width, t, with_hints)
+                for element in self.merged_elements()
+            ]
+
+        # Only creases from the identity symmetry are kept; the other copies
+        # are <use>s of them.
+        by_count = {}
+        for element in self.merged_elements():
+            by_count.setdefault(element.symmetry[1], []).append(element)
+
+        rendered = []
+        paper_to_output = t @ Matrix(width, 0, 0, width, 0, 0)
+        for count, group in by_count.items():
+            copies = self.paper_symmetries(count)[1:]
+            elements = [e.render_elements(width, t, with_hints) for e in group]
+            if not copies:
+                rendered += elements
+                continue
+            # Ids depend on the unit's creases, so different units drawn at
+            # the same place on a sheet don't share one.
+            group_id = (
+                "fundamental-"
+                + hashlib.sha1(
+                    repr(
+                        (
+                            self.structural_hash(),
+                            paper_to_output,
+                            with_hints,
+                            count,
+                        )
+                    ).encode()
+                ).hexdigest()[:12]
+            )
+            rendered.append(svg.G(id=group_id, elements=elements))
+            rendered += [
+                svg.Use(
+                    href=f"#{group_id}",
+                    transform=svg_transform(
+                        paper_to_output @ symmetry @ paper_to_output.inverse()
+                    ),
+                )
+                for symmetry in copies
+            ]
+        return rendered
+
+
+def merge_collinear_creases(elements, tolerance=1e-7) -> list:
+    """Joins crease lines that lie on the same line and touch or overlap into
+    single segments, and rejoins Bezier pieces that were clipped from the same
+    curve and meet end to end. Each merged crease takes the place of the
+    first piece it was built from."""
+    groups = {}
+    for element in elements:
+        key = _merge_key(element, tolerance)
+        if key:
+            groups.setdefault(key, []).append(element)
+
+    merged = []
+    for element in elements:
+        key = _merge_key(element, tolerance)
+        if not key:
+            merged.append(element)
+            continue
+        group = groups.pop(key, None)
+        if group and type(element) is CreaseLine:
+            merged += _merge_lines(group, tolerance)
+        elif group:
+            merged += _merge_curves(group, tolerance)
+    return merged
+
+
+def _merge_key(element, tolerance: float):
+    # Creases made under different symmetry groups are kept apart so that
+    # fundamental domain rendering knows how to copy each merged crease.
+    if type(element) is CreaseLine:
+        return "line", element.symmetry[1], _line_key(element.line, tolerance)
+    if type(element) is CreaseBezier:
+        return (
+            "curve",
+            element.symmetry[1],
+            tuple(v.key(tolerance) for v in element.source.control_points),
+        )
+    return None
+
+
+def _line_key(line: Line, tolerance: float):
+    # Doubling the angle makes the key the same whichever way the line runs,
+    # and the closest point to the origin pins down where it is.
+    direction = line.direction.normalised
+    normal = Vec(-direction.y, direction.x)
+    foot = normal * normal.dot(line.v1)
+    double_angle = Vec(
+        direction.x * direction.x - direction.y * direction.y,
+        2 * direction.x * direction.y,
+    )
+    return double_angle.key(tolerance), foot.key(tolerance)
+
+
+def _merge_lines(group: list[CreaseLine], tolerance: float) -> list[CreaseLine]:
+    if len(group) == 1:
+        return group
+    origin = group[0].line.v1
+    direction = group[0].line.direction.normalised
+    spans = []
+    for crease in group:
+        ends = sorted(
+            [crease.line.v1, crease.line.v2], key=lambda v: direction.dot(v - origin)
+        )
+        spans.append([direction.dot(v - origin) for v in ends] + ends)
+    spans.sort(key=lambda span: span[0])
+
+    merged = []
+    for span in spans:
+        if merged and span[0] <= merged[-1][1] + tolerance:
+            if span[1] > merged[-1][1]:
+                merged[-1][1], merged[-1][3] = span[1], span[3]
+        else:
+            merged.append(span)
+    return [
+        CreaseLine(Line(start, end), group[0].symmetry) for _, _, start, end in merged
+    ]
+
+
+def _merge_curves(group: list[CreaseBezier], tolerance: float) -> list[CreaseBezier]:
+    if len(group) == 1:
+        return group
+    source = group[0].source
+    spans = sorted(crease.span for crease in group)
+    merged = [list(spans[0])]
+    for t0, t1 in spans[1:]:
+        if t0 <= merged[-1][1] + tolerance:
+            merged[-1][1] = max(merged[-1][1], t1)
+        else:
+            merged.append([t0, t1])
+    if len(merged) == len(group):
+        return group
+    return [
+        CreaseBezier(source.segment(t0, t1), source, (t0, t1), group[0].symmetry)
+        for t0, t1 in merged
+    ]
+
 
 # Think about it as folding the paper, building up a state. Each task happens differently based on the current state.
 # Rotational doubling is simply done as you complete EACH task. e.g. double(actual_operation)
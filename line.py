@@ -30,6 +30,27 @@ class Line:
     def length(self):
         return (self.v2 - self.v1).magnitude
 
+    @property
+    def bounds(self) -> tuple[float, float, float, float]:
+        return (
+            min(self.v1.x, self.v2.x),
+            min(self.v1.y, self.v2.y),
+            max(self.v1.x, self.v2.x),
+            max(self.v1.y, self.v2.y),
+        )
+
+    def misses_box(self, bounds: tuple[float, float, float, float]) -> bool:
+        """True if the infinite line through this segment passes clear of the
+        (min_x, min_y, max_x, max_y) box."""
+        normal, d = self.as_vec_d()
+        min_x, min_y, max_x, max_y = bounds
+        sides = [
+            normal.x * x + normal.y * y - d
+            for x in (min_x, max_x)
+            for y in (min_y, max_y)
+        ]
+        return min(sides) > 0 or max(sides) < 0
+
     def intersection(self, other: "Line") -> Vec | None:
         xdiff = (self[0][0] - self[1][0], other[0][0] - other[1][0])
         ydiff = (self[0][1] - self[1][1], other[0][1] - other[1][1])
@@ -75,3 +96,14 @@ class Line:
         x = -(self.v2.y - self.v1.y)
         d = y * self.v1.y + self.v1.x * x
         return Vec(x, y), d
+
+
+def boxes_overlap(
+    a: tuple[float, float, float, float], b: tuple[float, float, float, float]
+) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def l(line: Line) -> dict[str, float]:
+    """line's end points as svg.Line keyword arguments."""
+    return {key: line[key] for key in line.keys()}
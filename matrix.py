@@ -1,17 +1,53 @@
 import math
-from vec import Vec
+import numpy
+from functools import lru_cache
+from vec import Vec, VecArray
 from line import Line
 from bezier import Bezier
+from operator import itemgetter
 from typing import overload
 
-class Matrix:
-    def __init__(self, data):
-        self.data = data
+_new = tuple.__new__
+
+
+class Matrix(tuple):
+    """Immutable 2D affine transform, stored as the six coefficients of
+
+        | a c e |
+        | b d f |
+        | 0 0 1 |
+
+    (the same layout as SVG's matrix(a b c d e f)).
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, a, b, c, d, e, f):
+        return _new(cls, (a, b, c, d, e, f))
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    a = property(itemgetter(0))
+    b = property(itemgetter(1))
+    c = property(itemgetter(2))
+    d = property(itemgetter(3))
+    e = property(itemgetter(4))
+    f = property(itemgetter(5))
+
+    @classmethod
+    def from_rows(cls, data) -> "Matrix":
+        (a, c, e), (b, d, f) = data[0], data[1]
+        return cls(a, b, c, d, e, f)
+
+    @property
+    def data(self):
+        return [[self.a, self.c, self.e], [self.b, self.d, self.f], [0, 0, 1]]
 
     def multiply_direction(self, other: Vec):
-        els = [other.x, other.y, 0]
-        x, y, _ = [sum([a * b for a, b in zip(els, row)]) for row in self.data]
-        return Vec(x, y)
+        return Vec(
+            self.a * other.x + self.c * other.y, self.b * other.x + self.d * other.y
+        )
 
     @overload
     def __mul__(self, other: Vec) -> Vec:
@@ -25,53 +61,112 @@ class Matrix:
     def __mul__(self, other: Bezier) -> Bezier:
         ...
 
-    def __mul__(self, other: Line | Vec | Bezier) -> Line | Vec | Bezier:
+    @overload
+    def __mul__(self, other: VecArray) -> VecArray:
+        ...
+
+    def __mul__(
+        self, other: Line | Vec | Bezier | VecArray
+    ) -> Line | Vec | Bezier | VecArray:
         if type(other) is Vec:
-            els = [other.x, other.y, 1]
-            x, y, _ = [sum([a * b for a, b in zip(els, row)]) for row in self.data]
-            return Vec(x, y)
+            a, b, c, d, e, f = self
+            x, y = other
+            return Vec(a * x + c * y + e, b * x + d * y + f)
         if type(other) is Line:
             return Line(self * other.v1, self * other.v2)
+        if type(other) is VecArray:
+            return self.apply_many(other)
         if type(other) is Bezier:
+            if type(other.control_points) is VecArray:
+                return Bezier(self.apply_many(other.control_points))
             return Bezier([self * v for v in other.control_points])
         raise Exception()
 
-    def __matmul__(self, mat):  # This is almost certainly wrong
-        cols = [
-            [sum([a * b for a, b in zip(col, row)]) for row in self.data]
-            for col in mat.transposed().data
-        ]
-        return Matrix(cols).transposed()
-
-    def transposed(self):
-        return Matrix([[self.data[j][i] for j in range(0, 3)] for i in range(0, 3)])
+    def __matmul__(self, other: "Matrix") -> "Matrix":
+        # self @ other applies other first, then self.
+        a, b, c, d, e, f = self
+        oa, ob, oc, od, oe, of = other
+        return _new(
+            Matrix,
+            (
+                a * oa + c * ob,
+                b * oa + d * ob,
+                a * oc + c * od,
+                b * oc + d * od,
+                a * oe + c * of + e,
+                b * oe + d * of + f,
+            ),
+        )
+
+    def inverse(self) -> "Matrix":
+        det = self.a * self.d - self.b * self.c
+        if det == 0:
+            raise ZeroDivisionError("Matrix is not invertible")
+        a, b, c, d = self.d / det, -self.b / det, -self.c / det, self.a / det
+        return Matrix(
+            a, b, c, d, -(a * self.e + c * self.f), -(b * self.e + d * self.f)
+        )
+
+    def apply_many(self, points: VecArray | numpy.ndarray | list[Vec]) -> VecArray:
+        if type(points) is not VecArray:
+            points = (
+                VecArray(points)
+                if isinstance(points, numpy.ndarray)
+                else VecArray.from_vecs(points)
+            )
+        # Written out like Matrix * Vec, so both give the same floats.
+        a, b, c, d, e, f = self
+        x, y = points.x, points.y
+        return VecArray(numpy.column_stack((a * x + c * y + e, b * x + d * y + f)))
+
+    def coefficients(self) -> tuple:
+        return tuple(self)
+
+    def __eq__(self, other):
+        if type(other) is not Matrix:
+            return NotImplemented
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        if type(other) is not Matrix:
+            return NotImplemented
+        return tuple.__ne__(self, other)
+
+    __hash__ = tuple.__hash__
+
+    def __repr__(self):
+        return "Matrix({}, {}, {}, {}, {}, {})".format(*self)
 
 
 def identity():
-    return Matrix([[1, 0, 0], [0, 1, 0], [0, 0, 1]])
+    return Matrix(1, 0, 0, 1, 0, 0)
 
 
-def rotate_around_point(point: Vec, angle_degrees) -> Matrix:
+# The factories below are cached on their (coordinate) parameters, so the
+# matrices they return are shared, which is safe as Matrix is immutable.
+@lru_cache(maxsize=4096, typed=True)
+def _rotation(x, y, angle_degrees) -> Matrix:
+    # offset_by(point) @ rotation @ offset_by(-point), folded into one affine.
     a = math.radians(angle_degrees)
-    return offset_by(point) @ Matrix(
-        [
-            [math.cos(a), -math.sin(a), 0],
-            [math.sin(a), math.cos(a), 0],
-            [0, 0, 1],
-        ] 
-    ) @ offset_by(-point)
-
-def scale_around_point(point: Vec, scaling_factor):
-    return offset_by(point) @ Matrix(
-        [
-            [scaling_factor, 0, 0],
-            [0, scaling_factor, 0],
-            [0, 0, 1],
-        ] 
-    ) @ offset_by(-point)
+    cos, sin = math.cos(a), math.sin(a)
+    return Matrix(cos, sin, -sin, cos, x - (cos * x - sin * y), y - (sin * x + cos * y))
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _scaling(x, y, scaling_factor) -> Matrix:
+    return Matrix(
+        scaling_factor,
+        0,
+        0,
+        scaling_factor,
+        x - scaling_factor * x,
+        y - scaling_factor * y,
+    )
 
 
-def reflect_over_line(l: Line):
+@lru_cache(maxsize=4096, typed=True)
+def _reflection(x1, y1, x2, y2) -> Matrix:
+    l = Line(Vec(x1, y1), Vec(x2, y2))
     dir = l.direction.normalised
     tan = l.tangent.normalised
     # 0 degrees, (1, 0)
@@ -83,23 +178,56 @@ def reflect_over_line(l: Line):
     # tan.dot(v) -> reflected
 
     centred_matrix = Matrix(
-        [
-            [dir.x * dir.x - tan.x * tan.x, dir.x * dir.y - tan.x * tan.y, 0],
-            [dir.y * dir.x - tan.y * tan.x, dir.y * dir.y - tan.y * tan.y, 0],
-            [0, 0, 1],
-        ]
+        dir.x * dir.x - tan.x * tan.x,
+        dir.y * dir.x - tan.y * tan.x,
+        dir.x * dir.y - tan.x * tan.y,
+        dir.y * dir.y - tan.y * tan.y,
+        0,
+        0,
     )
 
     return offset_by(l.v1) @ centred_matrix @ offset_by(-l.v1)
 
 
+@lru_cache(maxsize=4096, typed=True)
+def _offset(x, y) -> Matrix:
+    return Matrix(1, 0, 0, 1, x, y)
+
+
+def rotate_around_point(point: Vec, angle_degrees) -> Matrix:
+    return _rotation(point.x, point.y, angle_degrees)
+
+
+def scale_around_point(point: Vec, scaling_factor):
+    return _scaling(point.x, point.y, scaling_factor)
+
+
+def reflect_over_line(l: Line):
+    return _reflection(l.v1.x, l.v1.y, l.v2.x, l.v2.y)
+
+
 def reflect_x_at(x):
-    return Matrix([[-1, 0, x * 2], [0, 1, 0], [0, 0, 1]])
+    return Matrix(-1, 0, 0, 1, x * 2, 0)
 
 
 def reflect_y_at(y):
-    return Matrix([[1, 0, 0], [0, -1, y * 2], [0, 0, 1]])
+    return Matrix(1, 0, 0, -1, 0, y * 2)
 
 
 def offset_by(point: Vec):
-    return Matrix([[1, 0, point.x], [0, 1, point.y], [0, 0, 1]])
+    return _offset(point.x, point.y)
+
+
+def transform_cache_info() -> dict:
+    """Hit/miss statistics for each cached transform factory."""
+    return {
+        "rotate_around_point": _rotation.cache_info(),
+        "scale_around_point": _scaling.cache_info(),
+        "reflect_over_line": _reflection.cache_info(),
+        "offset_by": _offset.cache_info(),
+    }
+
+
+def clear_transform_cache():
+    for factory in (_rotation, _scaling, _reflection, _offset):
+        factory.cache_clear()
@@ -1,17 +1,112 @@
-
+import gzip
+import hashlib
 import os
+import zlib
+from collections import Counter
 from pathlib import Path
+from typing import Iterable
 
 import svg
 
+from svg_format import OutputFormat
+from svg_stream import StreamedSVG
+from tracing import element_count, tracer
+
+WRITE_BUFFER_SIZE = 1 << 16
+
+# Files written and files left alone because their content was unchanged,
+# across every ModelFileWriter.
+write_stats = Counter(written=0, skipped=0)
+
+
+def _content_digest(path: Path) -> bytes | None:
+    # Digest of the SVG text, so .svgz files compare by their content. None
+    # for a missing or unreadable file, which is then always replaced.
+    digest = hashlib.sha256()
+    try:
+        with gzip.open(path) if path.suffix == ".svgz" else open(path, "rb") as f:
+            while block := f.read(WRITE_BUFFER_SIZE):
+                digest.update(block)
+    except (OSError, EOFError, zlib.error):
+        return None
+    return digest.digest()
+
 
 class ModelFileWriter:
-    def __init__(self, folder: Path, model_name: str):
+    def __init__(
+        self,
+        folder: Path,
+        model_name: str | None,
+        batch_paths: bool = False,
+        output_format: OutputFormat | None = None,
+        compress: bool = False,
+    ):
+        """Pages are written as <model_name>_<page>.svg, or just <page>.svg
+        without a model name. batch_paths and output_format apply to every
+        page, streamed or not. compress: write gzipped .svgz files instead."""
         self._folder = folder
         self._model_name = model_name
+        self._batch_paths = batch_paths
+        self._output_format = output_format
+        self._compress = compress
+        self.written = 0
+        self.skipped = 0
+        self.paths: list[Path] = []
 
         os.makedirs(self._folder, exist_ok=True)
 
-    def write_svg(self, page: str, svg: svg.SVG):
-        with open(self._folder / f"{self._model_name}_{page}.svg", 'w') as f:
-            f.write(svg.as_str())
\ No newline at end of file
+    def _chunks(self, svg: svg.SVG | StreamedSVG) -> Iterable[str]:
+        if not isinstance(svg, StreamedSVG):
+            svg = StreamedSVG.of(svg)
+        if self._batch_paths:
+            svg = svg.batched()
+        return svg.formatted(self._output_format).chunks()
+
+    def write_svg(self, page: str, svg: svg.SVG | StreamedSVG):
+        """Streams the page into a temporary file, then moves it into place
+        unless the file already there has the same content."""
+        extension = "svgz" if self._compress else "svg"
+        name = f"{self._model_name}_{page}" if self._model_name else page
+        path = self._folder / f"{name}.{extension}"
+        temp_path = path.with_name(path.name + ".tmp")
+        self.paths.append(path)
+
+        digest = hashlib.sha256()
+        try:
+            with tracer.span("ModelFileWriter.write_svg", page=page) as counts:
+                chunk_count = size = 0
+                with open(temp_path, "wb", buffering=WRITE_BUFFER_SIZE) as raw:
+                    # mtime=0 and no file name keep the gzip header, and so
+                    # the file, the same from build to build.
+                    with (
+                        gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0)
+                        if self._compress
+                        else raw
+                    ) as f:
+                        for chunk in self._chunks(svg):
+                            data = chunk.encode()
+                            digest.update(data)
+                            f.write(data)
+                            chunk_count += 1
+                            size += len(data)
+                # A streamed document is one chunk per child between its tags.
+                counts["elements"] = (
+                    max(chunk_count - 2, 0)
+                    if isinstance(svg, StreamedSVG)
+                    else element_count(svg.elements)
+                )
+                counts["bytes"] = size
+
+            if _content_digest(path) == digest.digest():
+                os.remove(temp_path)
+                self.skipped += 1
+                write_stats["skipped"] += 1
+            else:
+                os.replace(temp_path, path)
+                self.written += 1
+                write_stats["written"] += 1
+        except BaseException:
+            # Rendering happens as the page streams out, so this is where
+            # a broken unit raises.
+            temp_path.unlink(missing_ok=True)
+            raise
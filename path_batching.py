@@ -0,0 +1,111 @@
+from numbers import Real
+from typing import Iterable, Iterator
+
+import svg
+
+# Attributes that may be set on an element for its geometry to be folded into
+# its class's combined path. Anything else (transforms, clip paths, ids...)
+# is kept as a separate element.
+_LINE_KEYS = {"class", "x1", "y1", "x2", "y2"}
+_RECT_KEYS = {"class", "x", "y", "width", "height"}
+_PATH_KEYS = {"class", "d"}
+_ABSOLUTE_COMMANDS = (svg.MoveTo, svg.LineTo, svg.CubicBezier)
+
+
+class _ClassPath:
+    def __init__(self, class_: list[str]):
+        self.class_ = class_
+        self.d: list[svg.PathData] = []
+        self.end = None
+
+    def move_to(self, x, y, closed=False):
+        # Joined strokes skip the move, so a plotter keeps the pen down. A
+        # closed shape starts its own subpath, or its Z would go back to the
+        # start of the stroke it joined.
+        if closed or self.end != (x, y):
+            self.d.append(svg.MoveTo(x, y))
+            self.end = (x, y)
+
+    def add(self, commands: list[svg.PathData]):
+        self.d += commands
+        last = commands[-1]
+        self.end = (last.x, last.y) if type(last) in _ABSOLUTE_COMMANDS else None
+
+    def element(self) -> svg.Path:
+        return svg.Path(class_=self.class_, d=self.d)
+
+
+def _numeric(*values) -> bool:
+    return all(isinstance(v, Real) for v in values)
+
+
+def _flatten(elements: Iterable) -> Iterator:
+    for element in elements:
+        if isinstance(element, (list, tuple)):
+            yield from _flatten(element)
+        elif element is not None:
+            yield element
+
+
+def _append_geometry(paths: dict, element) -> bool:
+    keys = element.as_dict().keys()
+    if "class" not in keys:
+        return False
+    if type(element) is svg.Line and keys == _LINE_KEYS:
+        if not _numeric(element.x1, element.y1, element.x2, element.y2):
+            return False
+        path = _path_for(paths, element.class_)
+        path.move_to(element.x1, element.y1)
+        path.add([svg.LineTo(element.x2, element.y2)])
+        return True
+    if type(element) is svg.Rect and keys == _RECT_KEYS:
+        x, y, width, height = element.x, element.y, element.width, element.height
+        if not _numeric(x, y, width, height):
+            return False
+        path = _path_for(paths, element.class_)
+        path.move_to(x, y, closed=True)
+        path.add(
+            [
+                svg.LineTo(x + width, y),
+                svg.LineTo(x + width, y + height),
+                svg.LineTo(x, y + height),
+                svg.ClosePath(),
+            ]
+        )
+        return True
+    if type(element) is svg.Path and keys == _PATH_KEYS:
+        commands = list(element.d)
+        if not commands or type(commands[0]) is not svg.MoveTo:
+            return False
+        if not all(_numeric(*vars(command).values()) for command in commands):
+            return False
+        path = _path_for(paths, element.class_)
+        path.move_to(
+            commands[0].x,
+            commands[0].y,
+            closed=any(type(command) is svg.ClosePath for command in commands),
+        )
+        if len(commands) > 1:
+            path.add(commands[1:])
+        return True
+    return False
+
+
+def _path_for(paths: dict, class_: list[str]) -> _ClassPath:
+    key = tuple(class_)
+    if key not in paths:
+        paths[key] = _ClassPath(class_)
+    return paths[key]
+
+
+def batch_paths(elements: Iterable) -> Iterator:
+    """Folds every plain line, rectangle and path into a single <path> per
+    style class. Other elements, and shapes carrying extra attributes or
+    unit-bearing lengths, are passed through unchanged and come first; the
+    combined paths follow in order of each class's first appearance."""
+    paths: dict[tuple, _ClassPath] = {}
+    for element in _flatten(elements):
+        if not (isinstance(element, svg.Element) and _append_geometry(paths, element)):
+            yield element
+    for path in paths.values():
+        yield path.element()
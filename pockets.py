@@ -2,6 +2,8 @@ import math
 import svg
 from vec import Vec
 from line import Line, lerp
+from render_cache import structural_hash
+from units import mm
 
 
 class AutoPocket:
@@ -18,6 +20,16 @@ class AutoPocket:
             self.inv_extra_angle_radians.append(math.radians(90 - extra * 2))
         self.hints = []
 
+    def structural_hash(self) -> str:
+        return structural_hash(
+            "AutoPocket",
+            self.angle_radians,
+            self.inv_angle_radians,
+            self.con,
+            self.inv_extra_angle_radians,
+            [(hint.from_x, hint.to_x, hint.to_y) for hint in self.hints],
+        )
+
     def extra_length(self):
         return self.con * math.tan(self.inv_angle_radians) * 0.25
 
@@ -29,7 +41,7 @@ class AutoPocket:
 
         pocket_vert = t * Vec(width * end_x, width * end_y)
 
-        c = t * Vec(width * start_x, svg.mm(0))
+        c = t * Vec(width * start_x, 0)
         if start_x < 0:
             c = lerp(c, pocket_vert, start_x / (start_x - end_x))
 
@@ -69,7 +81,7 @@ class AutoPocket:
                     **(
                         Line(
                             t * Vec(width * extra_x, width * extra_y),
-                            t * Vec(svg.mm(0), width * mid_y),
+                            t * Vec(0, width * mid_y),
                         )
                     ),
                 ),
@@ -112,7 +124,7 @@ class AutoPocket:
             from_ = t * Vec(self.from_x * width, 0)
             to = t * Vec(self.to_x * width, self.to_y * width)
             return [
-                svg.Circle(class_=["hint"], r=svg.mm(2), **from_.c),
-                svg.Circle(class_=["hint"], r=svg.mm(2), **to.c),
+                svg.Circle(class_=["hint"], r=mm(2), **from_.c),
+                svg.Circle(class_=["hint"], r=mm(2), **to.c),
                 svg.Line(class_=["hint"], **from_.v1, **to.v2),
             ]
@@ -0,0 +1,157 @@
+import hashlib
+from collections import OrderedDict
+from typing import Iterator
+
+import svg
+
+from matrix import Matrix, identity, offset_by
+from vec import Vec, VecArray
+
+# Entries kept by the shared render_cache. A full build renders fewer
+# distinct units than this, while a long running server stays bounded.
+CACHE_SIZE = 512
+
+
+def structural_hash(*parts) -> str:
+    """Stable digest of a unit's defining parameters. Built from reprs, so it
+    is the same across runs and processes (unlike hash() of strings)."""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def _moved(element, **geometry):
+    # A shallow copy with new coordinates. Much cheaper than
+    # dataclasses.replace, which re-runs __init__ over every svg attribute.
+    moved = object.__new__(type(element))
+    moved.__dict__ = {**element.__dict__, **geometry}
+    return moved
+
+
+def _element_points(element, points: list):
+    # Appends the coordinates of element (or a nested list of them) to
+    # points, in the order _with_points takes them back.
+    if isinstance(element, (list, tuple)):
+        for e in element:
+            _element_points(e, points)
+        return
+    if getattr(element, "transform", None) is not None:
+        raise TypeError("can't transform an element with its own transform")
+    if type(element) is svg.Line:
+        points += [(element.x1, element.y1), (element.x2, element.y2)]
+    elif type(element) is svg.Circle:
+        points.append((element.cx, element.cy))
+    elif type(element) is svg.Path:
+        for command in element.d:
+            if type(command) in (svg.MoveTo, svg.LineTo):
+                points.append((command.x, command.y))
+            elif type(command) is svg.CubicBezier:
+                points += [
+                    (command.x1, command.y1),
+                    (command.x2, command.y2),
+                    (command.x, command.y),
+                ]
+            elif type(command) is not svg.ClosePath:
+                raise TypeError(f"can't transform {type(command).__name__}")
+    else:
+        raise TypeError(f"can't transform {type(element).__name__}")
+
+
+def _with_points(element, points: Iterator[list[float]]):
+    # element with its coordinates replaced by the next ones from points.
+    if isinstance(element, (list, tuple)):
+        return [_with_points(e, points) for e in element]
+    if type(element) is svg.Line:
+        x1, y1 = next(points)
+        x2, y2 = next(points)
+        return _moved(element, x1=x1, y1=y1, x2=x2, y2=y2)
+    if type(element) is svg.Circle:
+        cx, cy = next(points)
+        return _moved(element, cx=cx, cy=cy)
+    return _moved(element, d=[_command_with_points(c, points) for c in element.d])
+
+
+def _command_with_points(command, points: Iterator[list[float]]):
+    if type(command) in (svg.MoveTo, svg.LineTo):
+        return type(command)(*next(points))
+    if type(command) is svg.CubicBezier:
+        (x1, y1), (x2, y2), (x, y) = next(points), next(points), next(points)
+        return svg.CubicBezier(x1=x1, y1=y1, x2=x2, y2=y2, x=x, y=y)
+    return command
+
+
+class _Placeable:
+    """Elements along with all of their coordinates as one VecArray, so
+    moving them is a single array transform."""
+
+    def __init__(self, elements):
+        points = []
+        _element_points(elements, points)
+        self.elements = elements
+        self.points = VecArray(points)
+
+    def placed(self, t: Matrix):
+        return _with_points(
+            self.elements, iter(t.apply_many(self.points).data.tolist())
+        )
+
+
+def transform_element(element, t: Matrix):
+    """element (or a nested list of them) with its coordinates mapped by t.
+    Raises TypeError for elements whose geometry can't be moved this way."""
+    return _Placeable(element).placed(t)
+
+
+class RenderCache:
+    """Unit geometry rendered once per (unit hash, width, with_hints) in unit
+    space, then moved into place for every render by transforming all of its
+    points at once.
+
+    Units opt in with a structural_hash() method. Units whose output can't be
+    moved by transform_element (e.g. <use> based symmetry copies) are always
+    rendered directly. The least recently used entries are dropped beyond
+    maxsize. Entries only live as long as the process, as their keys don't
+    change when the code rendering them does.
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, _Placeable | None] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, unit, width, t: Matrix, with_hints=False) -> list:
+        if not hasattr(unit, "structural_hash"):
+            return unit.render_elements(width, t, with_hints)
+        key = (unit.structural_hash(), repr(width), with_hints)
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        else:
+            self.misses += 1
+            self._entries[key] = self._unit_space(unit, width, with_hints)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        entry = self._entries[key]
+        if entry is None:
+            return unit.render_elements(width, t, with_hints)
+        return entry.placed(t)
+
+    @staticmethod
+    def _unit_space(unit, width, with_hints) -> _Placeable | None:
+        try:
+            return _Placeable(unit.render_elements(width, identity(), with_hints))
+        except TypeError:
+            return None
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+render_cache = RenderCache()
+
+
+def render_unit(unit, width, t: Matrix | Vec, with_hints=False) -> list:
+    """unit.render_elements through the shared render_cache."""
+    if type(t) is Vec:
+        t = offset_by(t)
+    return render_cache.render(unit, width, t, with_hints)
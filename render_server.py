@@ -0,0 +1,303 @@
+"""Renders units and sheets from JSON over HTTP, for interactive previews.
+
+POST /render takes a JSON object and returns the SVG:
+
+    {"sheet": "print", "unit": UNIT, "width": "30mm", "unit_count": 6}
+    {"sheet": "complex", "vertical_units": [UNIT...], "horizontal_units":
+        [UNIT...], "sheet_width": 7, "sheet_height": 9, "width": "30mm",
+        "extra_vertical_units": [[[UNIT...], [x, y]]...],
+        "extra_horizontal_units": [...]}
+    {"sheet": "cheatsheet", "units": [UNIT...], "width": "40mm",
+        "padding": "30mm"}
+    {"sheet": "model", "model": "sakura", "page": "jupiter"}
+
+where UNIT is {"length_ratio": 3.05, "p1": POCKET, "p2": POCKET, "name": ...,
+"count": ...} and POCKET is {"angle": 56.03, "con": 1, "extra": 60.37,
+"double_extra": true, "hint_from": -2} (or "hint_to"). Lengths are positive
+numbers in user units or strings like "30mm". Any request may also give
+"precision" (in mm) and "relative_paths" for the output format. unit_count is
+at most MAX_UNIT_COUNT, and sheet_width and sheet_height (in unit widths) at
+most MAX_SHEET_SIZE.
+
+Responses are kept in an LRU cache keyed by the request. GET /metrics returns
+request counts, latencies and cache hits as JSON. Browsers only let pages
+from the origin given with --cors-origin call the service.
+"""
+
+import argparse
+import json
+import math
+import re
+import time
+from collections import deque
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import svg
+
+import targets
+from pockets import AutoPocket
+from sheets import render_cheatsheet, render_complex_sheet, render_print_sheet
+from svg_format import OutputFormat
+from svg_stream import StreamedSVG
+from units import PX_PER_UNIT
+from vec import Vec
+from wireframe_unit import WireframeUnit
+
+CACHE_SIZE = 256
+# Bounds on request sizes, so one request can't tie up the server.
+MAX_UNIT_COUNT = 100
+MAX_SHEET_SIZE = 100
+# Latencies kept for the percentiles in /metrics.
+LATENCY_WINDOW = 1000
+
+_LENGTH = re.compile(r"\s*([-+]?[\d.]+(?:e[-+]?\d+)?)\s*([a-z]*)\s*")
+
+
+class RequestError(ValueError):
+    pass
+
+
+def _length(value) -> svg.Length | float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        number, unit = value, ""
+    else:
+        match = _LENGTH.fullmatch(str(value))
+        if not match or match[2] not in PX_PER_UNIT:
+            raise RequestError(f"not a length: {value!r}")
+        number, unit = float(match[1]), match[2]
+        if number.is_integer():
+            number = int(number)
+    if not 0 < number < math.inf:
+        raise RequestError(f"not a positive length: {value!r}")
+    return svg.Length(number, unit) if unit else number
+
+
+def _size(value, name: str, limit: int, integer=False):
+    if (
+        isinstance(value, bool)
+        or not isinstance(value, int if integer else (int, float))
+        or not 0 < value <= limit
+    ):
+        kind = "whole number" if integer else "number"
+        raise RequestError(f"{name} must be a positive {kind} up to {limit}")
+    return value
+
+
+def _pocket(spec: dict) -> AutoPocket:
+    pocket = AutoPocket(
+        spec["angle"],
+        spec["con"],
+        extra=spec.get("extra"),
+        double_extra=spec.get("double_extra", True),
+    )
+    if "hint_from" in spec:
+        pocket = pocket.with_hint_from(spec["hint_from"])
+    if "hint_to" in spec:
+        pocket = pocket.with_hint_to(spec["hint_to"])
+    return pocket
+
+
+def _unit(spec: dict) -> WireframeUnit:
+    return WireframeUnit(
+        spec["length_ratio"],
+        _pocket(spec["p1"]),
+        _pocket(spec["p2"]),
+        name=spec.get("name"),
+        count=spec.get("count"),
+    )
+
+
+def _units(specs: list) -> list[WireframeUnit]:
+    return [_unit(spec) for spec in specs]
+
+
+def _extra_units(specs: list) -> list[tuple[list[WireframeUnit], Vec]]:
+    return [(_units(units), Vec(*offset)) for units, offset in specs]
+
+
+class _PageCapture:
+    """Stands in for a ModelFileWriter and keeps one page instead."""
+
+    def __init__(self, page: str):
+        self.page = page
+        self.svg = None
+
+    def write_svg(self, page: str, svg):
+        if page == self.page:
+            self.svg = svg
+
+
+def _model_page(model: str, page: str):
+    if model not in targets.targets or targets.targets[model].model_name is None:
+        raise RequestError(f"unknown model: {model!r}")
+    capture = _PageCapture(page)
+    targets.targets[model].load()(capture)
+    if capture.svg is None:
+        raise RequestError(f"{model} has no page {page!r}")
+    return capture.svg
+
+
+def _sheet(request: dict):
+    output_format = OutputFormat(
+        request.get("precision"), request.get("relative_paths", False)
+    )
+    sheet = request.get("sheet", "print")
+    if sheet == "print":
+        return render_print_sheet(
+            _unit(request["unit"]),
+            _length(request.get("width", "30mm")),
+            _size(request.get("unit_count", 1), "unit_count", MAX_UNIT_COUNT, True),
+            output_format=output_format,
+        )
+    if sheet == "complex":
+        return render_complex_sheet(
+            _units(request.get("vertical_units", [])),
+            _units(request.get("horizontal_units", [])),
+            _size(request["sheet_width"], "sheet_width", MAX_SHEET_SIZE),
+            _size(request["sheet_height"], "sheet_height", MAX_SHEET_SIZE),
+            _length(request.get("width", "30mm")),
+            extra_vertical_units=_extra_units(request.get("extra_vertical_units", [])),
+            extra_horizontal_units=_extra_units(
+                request.get("extra_horizontal_units", [])
+            ),
+            output_format=output_format,
+        )
+    if sheet == "cheatsheet":
+        return render_cheatsheet(
+            _units(request["units"]),
+            _length(request.get("width", "40mm")),
+            _length(request.get("padding", "30mm")),
+            output_format=output_format,
+        )
+    if sheet == "model":
+        page = _model_page(request["model"], request["page"])
+        return page.formatted(output_format) if isinstance(page, StreamedSVG) else page
+    raise RequestError(f"unknown sheet: {sheet!r}")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def render(request: str) -> bytes:
+    """The SVG for a request, given as canonical JSON."""
+    return _sheet(json.loads(request)).as_str().encode()
+
+
+class Metrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def as_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            return latencies[int(p * (len(latencies) - 1))] if latencies else None
+
+        cache = render.cache_info()
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_ms": {
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": latencies[-1] if latencies else None,
+            },
+            "cache": {
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "size": cache.currsize,
+                "max_size": cache.maxsize,
+            },
+        }
+
+
+metrics = Metrics()
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    # Origin of the preview page allowed to call the service from a browser,
+    # if it is served from elsewhere.
+    cors_origin: str | None = None
+
+    def _send_cors_headers(self):
+        if self.cors_origin:
+            self.send_header("Access-Control-Allow-Origin", self.cors_origin)
+            self.send_header("Vary", "Origin")
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self._send_cors_headers()
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, value):
+        self._send(status, json.dumps(value).encode(), "application/json")
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        if self.cors_origin:
+            self._send_cors_headers()
+            self.send_header("Access-Control-Allow-Methods", "GET, POST")
+            self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._send_json(200, metrics.as_dict())
+        else:
+            self._send_json(404, {"error": f"no such path: {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/render":
+            self._send_json(404, {"error": f"no such path: {self.path}"})
+            return
+        start = time.perf_counter()
+        metrics.requests += 1
+        try:
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            if not isinstance(request, dict):
+                raise RequestError("expected a JSON object")
+            body = render(json.dumps(request, sort_keys=True))
+        except (RequestError, KeyError, TypeError, ValueError) as e:
+            metrics.errors += 1
+            self._send_json(400, {"error": f"{type(e).__name__}: {e}"})
+            return
+        except Exception as e:
+            metrics.errors += 1
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        metrics.latencies.append((time.perf_counter() - start) * 1000)
+        self._send(200, body, "image/svg+xml")
+
+
+def serve(host="127.0.0.1", port=8765, cors_origin: str | None = None):
+    # Import every model up front, so the first request for one is fast too.
+    for target in targets.load_targets().values():
+        target.load()
+    handler = type("RenderHandler", (RenderHandler,), {"cors_origin": cors_origin})
+    # Single threaded: renders share the unit render cache.
+    server = HTTPServer((host, port), handler)
+    print(f"Serving on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--cors-origin",
+        metavar="ORIGIN",
+        help="let pages from ORIGIN (e.g. http://localhost:3000) call the "
+        "service from a browser",
+    )
+    args = parser.parse_args()
+    serve(args.host, args.port, args.cors_origin)
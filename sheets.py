@@ -1,11 +1,17 @@
+from contextlib import contextmanager
 from enum import IntEnum
 
 import svg
 from textwrap import dedent
 from line_simplifier import LineSimplifier
+from render_cache import render_unit
+from svg_format import OutputFormat
+from svg_stream import StreamedSVG
+from tracing import traced
+from units import DocumentUnits, mm, to_px
 from vec import Vec
 from matrix import *
-from typing import List, Protocol
+from typing import Iterable, List, Protocol
 
 
 class BaseUnit(Protocol):
@@ -16,6 +22,32 @@ class BaseUnit(Protocol):
     def height(self, width: float) -> float: ...
 
 
+class SheetDefaults:
+    """Options that sheets, and units made while building them, take when
+    their caller leaves them as None. A build sets them for all of its sheets
+    with using()."""
+
+    def __init__(self):
+        self.instance_units = False
+        self.fundamental_domain = False
+        self.tessellate = False
+
+    @contextmanager
+    def using(self, **options):
+        saved = dict(vars(self))
+        for name, value in options.items():
+            if name not in saved:
+                raise TypeError(f"unknown sheet option: {name}")
+            setattr(self, name, value)
+        try:
+            yield
+        finally:
+            vars(self).update(saved)
+
+
+sheet_defaults = SheetDefaults()
+
+
 def common_elements():
     return [svg.Style(text=dedent("""
 .valley {stroke: #00f; stroke-width: 2px; fill:none}
@@ -25,36 +57,87 @@ def common_elements():
 """))]
 
 
-def render_print_sheet(unit: BaseUnit, width: float, unit_count: int) -> svg.SVG:
-    elements = [
-        common_elements(),
-        svg.Rect(
+def svg_transform(t: Matrix) -> list[svg.Transform]:
+    return [svg.Matrix(*t.coefficients())]
+
+
+def _placed_units(
+    placements: Iterable[tuple[BaseUnit, Matrix]], width: float, instance_units: bool
+):
+    """Renders each (unit, transform) placement. When instancing, every
+    distinct unit, by structural_hash() where it has one, is rendered once
+    into a <symbol> and each placement becomes a <use> of it."""
+    if not instance_units:
+        for unit, t in placements:
+            yield from render_unit(unit, width, t)
+        return
+
+    symbol_ids = {}
+    symbols = []
+    uses = []
+    for unit, t in placements:
+        # Equal units built separately share a symbol.
+        key = unit.structural_hash() if hasattr(unit, "structural_hash") else id(unit)
+        if key not in symbol_ids:
+            symbol_ids[key] = f"unit-{len(symbols)}"
+            symbols.append(
+                svg.Symbol(
+                    id=symbol_ids[key],
+                    overflow="visible",
+                    elements=render_unit(unit, width, identity()),
+                )
+            )
+        uses.append(svg.Use(href=f"#{symbol_ids[key]}", transform=svg_transform(t)))
+    if symbols:
+        yield svg.Defs(elements=symbols)
+    yield from uses
+
+
+@traced()
+def render_print_sheet(
+    unit: BaseUnit,
+    width: float,
+    unit_count: int,
+    instance_units: bool | None = None,
+    output_format: OutputFormat | None = None,
+) -> StreamedSVG:
+    if instance_units is None:
+        instance_units = sheet_defaults.instance_units
+    units = DocumentUnits(width)
+    sheet_width = units.length(units.value(width) * unit_count)
+    sheet_height = units.length(units.value(width) * unit.length_ratio)
+    width = to_px(width)
+
+    def elements():
+        yield from common_elements()
+        yield svg.Rect(
             class_=["cut"],
             x=0,
             y=0,
             width=width * unit_count,
             height=width * unit.length_ratio,
-        ),
-        *[
-            svg.Line(
+        )
+        for i in range(1, unit_count):
+            yield svg.Line(
                 class_=["cut"],
                 x1=i * width,
                 y1=0,
                 x2=i * width,
                 y2=width * unit.length_ratio,
             )
-            for i in range(1, unit_count)
-        ],
-    ]
 
-    for i in range(0, unit_count):
-        elements += unit.render_elements(width, offset_by(Vec(i * width, 0)))
+        yield from _placed_units(
+            ((unit, offset_by(Vec(i * width, 0))) for i in range(0, unit_count)),
+            width,
+            instance_units,
+        )
 
-    return svg.SVG(
-        width=width * unit_count, height=width * unit.length_ratio, elements=elements
-    )
+    return StreamedSVG(
+        width=sheet_width, height=sheet_height, elements=elements
+    ).formatted(output_format)
 
 
+@traced()
 def render_complex_sheet(
     vertical_units: list[BaseUnit],
     horizontal_units: list[BaseUnit],
@@ -63,64 +146,69 @@ def render_complex_sheet(
     width: float,
     extra_vertical_units: list[tuple[list[BaseUnit], Vec]] = [],
     extra_horizontal_units: list[tuple[list[BaseUnit], Vec]] = [],
-) -> svg.SVG:
-    elements: list[svg.Element] = [
-        *common_elements(),
-    ]
-
-    lines = LineSimplifier()
-
-    for index, unit in enumerate(vertical_units):
-        elements += unit.render_elements(width, offset_by(Vec(index * width, 0)))
-        lines.add_rectangle(index, index + 1, 0, unit.length_ratio)
-
-    for index, unit in enumerate(reversed(horizontal_units)):
-        elements += unit.render_elements(
-            width,
-            offset_by(Vec(sheet_width * width, (sheet_height - index - 1) * width))
-            @ rotate_around_point(Vec(0, 0), 90),
-        )
-        lines.add_rectangle(
-            sheet_width - unit.length_ratio,
-            sheet_width,
-            sheet_height - index - 1,
-            sheet_height - index,
-        )
-
-    for units, offset in extra_vertical_units:
-        for index, unit in enumerate(units):
-            elements += unit.render_elements(
-                width, offset_by(offset * width + Vec(index * width, 0))
-            )
-            lines.add_rectangle(
-                offset.x + index,
-                offset.x + index + 1,
-                offset.y,
-                offset.y + unit.length_ratio,
-            )
-
-    for units, offset in extra_horizontal_units:
-        for index, unit in enumerate(units):
-            elements += unit.render_elements(
-                width,
-                offset_by(offset * width + Vec(0, (index + 1) * width))
-                @ rotate_around_point(Vec(0, 0), -90),
-            )
+    instance_units: bool | None = None,
+    output_format: OutputFormat | None = None,
+) -> StreamedSVG:
+    if instance_units is None:
+        instance_units = sheet_defaults.instance_units
+    units = DocumentUnits(width)
+    document_width = units.length(units.value(width) * sheet_width)
+    document_height = units.length(units.value(width) * sheet_height)
+    width = to_px(width)
+
+    def placements(lines: LineSimplifier):
+        for index, unit in enumerate(vertical_units):
+            yield unit, offset_by(Vec(index * width, 0))
+            lines.add_rectangle(index, index + 1, 0, unit.length_ratio)
+
+        for index, unit in enumerate(reversed(horizontal_units)):
+            yield unit, offset_by(
+                Vec(sheet_width * width, (sheet_height - index - 1) * width)
+            ) @ rotate_around_point(Vec(0, 0), 90)
             lines.add_rectangle(
-                offset.x,
-                offset.x + unit.length_ratio,
-                offset.y + index,
-                offset.y + index + 1,
+                sheet_width - unit.length_ratio,
+                sheet_width,
+                sheet_height - index - 1,
+                sheet_height - index,
             )
 
-    elements += lines.render(width)
-
-    return svg.SVG(
-        width=width * sheet_width, height=width * sheet_height, elements=elements
-    )
-
-
-def render_hex_grid(size, scaling):
+        for units, offset in extra_vertical_units:
+            for index, unit in enumerate(units):
+                yield unit, offset_by(offset * width + Vec(index * width, 0))
+                lines.add_rectangle(
+                    offset.x + index,
+                    offset.x + index + 1,
+                    offset.y,
+                    offset.y + unit.length_ratio,
+                )
+
+        for units, offset in extra_horizontal_units:
+            for index, unit in enumerate(units):
+                yield unit, offset_by(
+                    offset * width + Vec(0, (index + 1) * width)
+                ) @ rotate_around_point(Vec(0, 0), -90)
+                lines.add_rectangle(
+                    offset.x,
+                    offset.x + unit.length_ratio,
+                    offset.y + index,
+                    offset.y + index + 1,
+                )
+
+    def elements():
+        yield from common_elements()
+        lines = LineSimplifier()
+        yield from _placed_units(placements(lines), width, instance_units)
+        yield from lines.render(width)
+
+    return StreamedSVG(
+        width=document_width, height=document_height, elements=elements
+    ).formatted(output_format)
+
+
+@traced()
+def render_hex_grid(size, scaling, tessellate: bool | None = None):
+    if tessellate is None:
+        tessellate = sheet_defaults.tessellate
     width_ratio = math.sqrt(3) * 2.0 / 3
     centre = Vec(size * width_ratio * scaling * 0.5, size * scaling * 0.5)
 
@@ -131,6 +219,8 @@ def render_hex_grid(size, scaling):
         ]
 
     start = Vec(size * width_ratio * scaling * 0.25, 0)
+    if tessellate:
+        return _render_hex_grid_third(size, scaling, width_ratio, centre, start)
     hex = svg.Path(
         class_=["cut"],
         d=efficient_path(
@@ -201,7 +291,77 @@ def render_hex_grid(size, scaling):
             )
             for i in range(0, 3)
         ]
-    return svg.SVG(
+    return StreamedSVG(
+        width=size * width_ratio * scaling, height=size * scaling, elements=elements
+    )
+
+
+def _render_hex_grid_third(size, scaling, width_ratio, centre: Vec, start: Vec):
+    # The grid has 120 degree rotational symmetry, so only the strokes of one
+    # third are written out, and the other two are rotated <use>s of them.
+    reflect = reflect_x_at(centre.x)
+    rotate_120 = rotate_around_point(centre, 120)
+    rotate_240 = rotate_around_point(centre, 240)
+
+    def path_through(point, transformations):
+        first, *rest = [t * point for t in transformations]
+        return [svg.MoveTo(*first), *[svg.LineTo(*v) for v in rest]]
+
+    def row_start(i):
+        return Vec(abs(size * 0.5 - i) * width_ratio * scaling * 0.5, i * scaling)
+
+    third = [
+        svg.Path(
+            class_=["cut"],
+            d=path_through(
+                start,
+                [identity(), rotate_around_point(centre, 60), rotate_120],
+            ),
+        ),
+        *[
+            svg.Path(
+                class_=["valley"],
+                d=path_through(
+                    row_start(i), [rotate_120 @ reflect, identity(), reflect]
+                ),
+            )
+            for i in range(1, size // 4)
+        ],
+        *[
+            svg.Path(
+                class_=["valley"],
+                d=path_through(
+                    row_start(i), [rotate_240 @ reflect, identity(), reflect]
+                ),
+            )
+            for i in range((3 * size + 4) // 4, size)
+        ],
+    ]
+    if size % 4 == 0:
+        third += [
+            svg.Path(
+                class_=["valley"],
+                d=path_through(row_start(i), [rotate_240, identity()]),
+            )
+            for i in [size // 4, 3 * size // 4]
+        ]
+    if size % 2 == 0:
+        third.append(
+            svg.Line(
+                class_=["valley"],
+                **Line(start, rotate_around_point(centre, 180) * start),
+            )
+        )
+
+    elements = [
+        common_elements(),
+        svg.G(id="hex-grid-third", elements=third),
+        *[
+            svg.Use(href="#hex-grid-third", transform=svg_transform(rotation))
+            for rotation in [rotate_120, rotate_240]
+        ],
+    ]
+    return StreamedSVG(
         width=size * width_ratio * scaling, height=size * scaling, elements=elements
     )
 
@@ -214,19 +374,35 @@ class HintType(IntEnum):
     EDGE = 2
 
 
-def render_cheatsheet(units: list[BaseUnit], width: float, padding: float) -> svg.SVG:
+@traced()
+def render_cheatsheet(
+    units: list[BaseUnit],
+    width: float,
+    padding: float,
+    output_format: OutputFormat | None = None,
+) -> StreamedSVG:
+    document_units = DocumentUnits(width)
+    document_width = document_units.value(width)
+    document_padding = document_units.value(padding)
+    sheet_width = document_units.length(
+        (document_padding + document_width) * len(units) + document_padding
+    )
+    sheet_height = document_units.length(
+        max(unit.height(document_width) for unit in units) + document_padding * 2
+    )
+    width = to_px(width)
+    padding = to_px(padding)
+
     def x_offset_for(i):
         return (padding + width) * i + padding
 
-    height = max(unit.height(width) for unit in units) + padding * 2
-
     def unit_elements_for(unit: BaseUnit, i):
         x = x_offset_for(i)
         return [
             svg.Text(
                 text=f"{unit.name} Unit x{unit.count}",
                 x=x,
-                y=padding - svg.mm(13),
+                y=padding - mm(13),
                 font_size=20,
                 font_weight="bold",
                 font_family="sans-serif",
@@ -234,7 +410,7 @@ def render_cheatsheet(units: list[BaseUnit], width: float, padding: float) -> sv
             svg.Text(
                 text=f"Length ratio {unit.length_ratio:.2f}",
                 x=x,
-                y=padding - svg.mm(5),
+                y=padding - mm(5),
                 font_size=20,
                 font_weight="bold",
                 font_family="sans-serif",
@@ -246,15 +422,16 @@ def render_cheatsheet(units: list[BaseUnit], width: float, padding: float) -> sv
                 width=width,
                 height=width * unit.length_ratio,
             ),
-            *unit.render_elements(width, Vec(x, padding), with_hints=True),
+            *render_unit(unit, width, Vec(x, padding), with_hints=True),
         ]
 
-    elements = [
-        *common_elements(),
-        *[unit_elements_for(unit, i) for i, unit in enumerate(units)],
-    ]
-    return svg.SVG(
-        width=x_offset_for(len(units)),
-        height=height,
+    def elements():
+        yield from common_elements()
+        for i, unit in enumerate(units):
+            yield unit_elements_for(unit, i)
+
+    return StreamedSVG(
+        width=sheet_width,
+        height=sheet_height,
         elements=elements,
-    )
+    ).formatted(output_format)
@@ -0,0 +1,109 @@
+import math
+
+import svg
+
+from units import mm
+
+_RELATIVE = {
+    svg.MoveTo: svg.MoveToRel,
+    svg.LineTo: svg.LineToRel,
+    svg.CubicBezier: svg.CubicBezierRel,
+}
+
+
+class OutputFormat:
+    """How numbers are written into an SVG.
+
+    precision is the coarsest step, in mm, that lengths may be rounded to
+    (None keeps full float precision). Rounded numbers are written in their
+    shortest form, so 7.0 becomes 7. relative_paths writes path data as
+    offsets from the previous point, which keeps the numbers short. Offsets
+    are taken between rounded points, so rounding errors don't add up along a
+    path.
+    """
+
+    def __init__(self, precision: float | None = None, relative_paths=False):
+        self.precision = precision
+        self.relative_paths = relative_paths
+        self.decimals = (
+            None
+            if precision is None
+            else max(0, math.ceil(-math.log10(mm(precision))))
+        )
+
+    def number(self, value):
+        if self.decimals is None or type(value) is not float:
+            return value
+        value = round(value, self.decimals)
+        return int(value) if value.is_integer() else value
+
+    def element(self, element):
+        """A copy of element (or a nested list of them) with its numbers
+        formatted. Transform coefficients other than the offset are kept."""
+        if isinstance(element, (list, tuple)):
+            return [self.element(e) for e in element]
+        if not isinstance(element, svg.Element):
+            return element
+        attributes = {}
+        for key, value in vars(element).items():
+            if key == "d" and value:
+                value = self.path(value)
+            elif key == "transform" and value:
+                value = [self._transform(t) for t in value]
+            elif key == "elements" and value:
+                value = self.element(value)
+            elif type(value) is svg.Length:
+                value = svg.Length(self.number(value.value), value.unit)
+            else:
+                value = self.number(value)
+            attributes[key] = value
+        formatted = object.__new__(type(element))
+        formatted.__dict__ = attributes
+        return formatted
+
+    def _transform(self, transform):
+        if type(transform) is svg.Matrix:
+            return svg.Matrix(
+                transform.a,
+                transform.b,
+                transform.c,
+                transform.d,
+                self.number(transform.e),
+                self.number(transform.f),
+            )
+        return transform
+
+    def path(self, commands: list) -> list:
+        if self.relative_paths and all(
+            type(c) in _RELATIVE or type(c) is svg.ClosePath for c in commands
+        ):
+            return self._relative_path(commands)
+        return [
+            type(c)(**{k: self.number(v) for k, v in vars(c).items()})
+            for c in commands
+        ]
+
+    def _relative_path(self, commands: list) -> list:
+        x = y = 0
+        start = (0, 0)
+        relative = []
+        for command in commands:
+            if type(command) is svg.ClosePath:
+                relative.append(command)
+                x, y = start
+                continue
+            # Coordinates of a command come in (x, y) pairs, all relative to
+            # the point the command starts from.
+            values = [self.number(v) for v in vars(command).values()]
+            relative.append(
+                _RELATIVE[type(command)](
+                    *[
+                        self.number(v - (x if i % 2 == 0 else y))
+                        for i, v in enumerate(values)
+                    ]
+                )
+            )
+            x, y = values[-2], values[-1]
+            if type(command) is svg.MoveTo:
+                start = (x, y)
+        return relative
@@ -0,0 +1,81 @@
+import dataclasses
+from typing import Callable, Iterable, Iterator, TextIO
+
+import svg
+
+from path_batching import batch_paths
+from svg_format import OutputFormat
+from tracing import traced
+
+_END = object()
+
+
+class StreamedSVG:
+    """An SVG document whose children are serialized one at a time.
+
+    `elements` can be any iterable, or a function returning one, like a
+    generator function that renders units as it goes, so the whole element
+    tree never has to exist at once. A function is called again each time
+    the document is written; an iterator can only be written once. The
+    output is the same as `svg.SVG(elements=...).as_str()`.
+    """
+
+    def __init__(self, elements: Iterable | Callable[[], Iterable] = (), **attributes):
+        self.root = svg.SVG(**attributes)
+        self._elements = elements
+        self._consumed = False
+
+    @property
+    def elements(self) -> Iterable:
+        if callable(self._elements):
+            return self._elements()
+        if iter(self._elements) is self._elements:
+            if self._consumed:
+                raise RuntimeError("this StreamedSVG's elements were used up")
+            self._consumed = True
+        return self._elements
+
+    @classmethod
+    def of(cls, document: svg.SVG) -> "StreamedSVG":
+        """document as a StreamedSVG, which writes the same text."""
+        streamed = cls(document.elements or ())
+        streamed.root = dataclasses.replace(document, elements=None)
+        return streamed
+
+    def batched(self) -> "StreamedSVG":
+        """The same document with each style class drawn as one combined path."""
+        batched = StreamedSVG(lambda: batch_paths(self.elements))
+        batched.root = self.root
+        return batched
+
+    def formatted(self, output_format: OutputFormat | None) -> "StreamedSVG":
+        """The same document with its numbers written as output_format says."""
+        if output_format is None:
+            return self
+        formatted = StreamedSVG(lambda: map(output_format.element, self.elements))
+        formatted.root = output_format.element(self.root)
+        return formatted
+
+    def chunks(self) -> Iterator[str]:
+        props = " ".join(f'{k}="{v}"' for k, v in self.root.as_dict().items())
+        name = self.root.element_name
+        elements = iter(self.elements)
+        first = next(elements, _END)
+        if first is _END:
+            yield f"<{name} {props}/>"
+            return
+        yield f"<{name} {props}>"
+        yield svg.Element._as_str(first)
+        for element in elements:
+            yield svg.Element._as_str(element)
+        yield f"</{name}>"
+
+    def write(self, f: TextIO):
+        f.writelines(self.chunks())
+
+    @traced()
+    def as_str(self) -> str:
+        return "".join(self.chunks())
+
+    def __str__(self) -> str:
+        return self.as_str()
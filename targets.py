@@ -0,0 +1,367 @@
+import argparse
+import importlib
+import os
+import pkgutil
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+import model_file_writer
+import render_cache
+import sheets
+import svg_format
+import tracing
+from build_cache import ROOT, BuildCache
+from tracing import TRACE_ENV
+
+# Library modules are used through their module objects, as watch() reloads
+# them and the reloaded modules have new classes and shared instances.
+
+MODELS_PACKAGE = "models"
+BUILD_CACHE_PATH = Path(".build_cache.json")
+# Modules whose @sheet functions write the sheets at the top of the repo.
+SHEET_MODULES = ["unitsvg"]
+WATCH_INTERVAL = 0.2
+
+
+class Target:
+    """A named group of SVG files, written by calling module.function(writer).
+
+    Only the name of the module is kept, so listing targets imports nothing
+    and the function is looked up afresh each time the target is built.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        module: str,
+        function: str = "write_files",
+        folder: Path = Path("."),
+        model_name: str | None = None,
+    ):
+        self.name = name
+        self.module = module
+        self.function = function
+        self.folder = folder
+        self.model_name = model_name
+
+    def load(self) -> Callable[[model_file_writer.ModelFileWriter], None]:
+        return getattr(importlib.import_module(self.module), self.function)
+
+    def build(
+        self,
+        precision: float | None = None,
+        relative_paths=False,
+        instance_units=False,
+        fundamental_domain=False,
+        tessellate=False,
+        **writer_options,
+    ) -> model_file_writer.ModelFileWriter:
+        """Writes the target's files. precision and relative_paths give the
+        writer's output format, and the sheet options become the defaults of
+        every sheet written (see sheets.SheetDefaults)."""
+        if precision is not None or relative_paths:
+            writer_options["output_format"] = svg_format.OutputFormat(
+                precision, relative_paths
+            )
+        writer = model_file_writer.ModelFileWriter(
+            self.folder, self.model_name, **writer_options
+        )
+        with sheets.sheet_defaults.using(
+            instance_units=instance_units,
+            fundamental_domain=fundamental_domain,
+            tessellate=tessellate,
+        ):
+            self.load()(writer)
+        return writer
+
+    def __repr__(self):
+        return f"Target({self.name!r}, {self.module}.{self.function})"
+
+
+targets: dict[str, Target] = {}
+
+
+def register(target: Target) -> Target:
+    targets[target.name] = target
+    return target
+
+
+def sheet(name: str):
+    """Registers a write_files style function as the target name. Its pages
+    are written to the top of the repo under their own names."""
+
+    def decorator(function: Callable[[model_file_writer.ModelFileWriter], None]):
+        register(Target(name, function.__module__, function.__name__))
+        return function
+
+    return decorator
+
+
+def load_targets() -> dict[str, Target]:
+    """Every sheet and model target. Sheet modules are imported to run their
+    @sheet decorators; models are only found by file name."""
+    for module in SHEET_MODULES:
+        importlib.import_module(module)
+    for module in pkgutil.iter_modules([MODELS_PACKAGE]):
+        register(
+            Target(
+                module.name,
+                f"{MODELS_PACKAGE}.{module.name}",
+                folder=Path("output"),
+                model_name=module.name,
+            )
+        )
+    return targets
+
+
+class BuildResult:
+    """What building one target did: the files it wrote (outputs), how many
+    of them changed, and the formatted traceback if it raised."""
+
+    def __init__(
+        self, name: str, outputs=(), written=0, skipped=0, seconds=0.0, error=None
+    ):
+        self.name = name
+        self.outputs = list(outputs)
+        self.written = written
+        self.skipped = skipped
+        self.seconds = seconds
+        self.error = error
+
+
+def build_target(name: str, options: dict) -> BuildResult:
+    start = time.perf_counter()
+    try:
+        with tracing.tracer.target(name):
+            writer = targets[name].build(**options)
+    except Exception:
+        return BuildResult(
+            name, seconds=time.perf_counter() - start, error=traceback.format_exc()
+        )
+    return BuildResult(
+        name,
+        [str(path) for path in writer.paths],
+        writer.written,
+        writer.skipped,
+        time.perf_counter() - start,
+    )
+
+
+def build_targets(
+    names: list[str], jobs: int | None = None, **options
+) -> list[BuildResult]:
+    """Builds the named targets, in parallel on a process pool unless jobs is
+    1. Each target writes its own files, so the results don't depend on how
+    the targets were scheduled. Results come back in the order of names."""
+    jobs = min(jobs or os.cpu_count() or 1, len(names))
+    if jobs <= 1:
+        return [build_target(name, options) for name in names]
+    # Workers started without fork don't inherit the registry.
+    with ProcessPoolExecutor(jobs, initializer=load_targets) as pool:
+        return list(pool.map(build_target, names, [options] * len(names)))
+
+
+def build_changed(
+    names: list[str],
+    cache: BuildCache,
+    jobs: int | None,
+    options: dict,
+    force=False,
+) -> list[BuildResult]:
+    """Builds those of the named targets whose fingerprints changed, records
+    them in the cache and prints a report."""
+    start = time.perf_counter()
+    fingerprints = {name: cache.fingerprint(targets[name], options) for name in names}
+    stale = [
+        name
+        for name, fingerprint in fingerprints.items()
+        if force or not cache.is_fresh(name, fingerprint)
+    ]
+    results = build_targets(stale, jobs, **options)
+    for result in results:
+        if result.error:
+            cache.forget(result.name)
+        else:
+            cache.record(result.name, fingerprints[result.name], result.outputs)
+    cache.save()
+
+    failed = [result for result in results if result.error]
+    for result in failed:
+        print(f"{result.name} failed:\n{result.error}", file=sys.stderr)
+    print(
+        f"{len(results) - len(failed)} targets built, {len(failed)} failed, "
+        f"{len(fingerprints) - len(results)} up to date: "
+        f"{sum(result.written for result in results)} files written, "
+        f"{sum(result.skipped for result in results)} unchanged "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return results
+
+
+def _source_mtimes() -> dict[Path, int]:
+    paths = [*ROOT.glob("*.py"), *(ROOT / MODELS_PACKAGE).glob("*.py")]
+    return {path: path.stat().st_mtime_ns for path in paths}
+
+
+def _reload(changed: set[Path], cache: BuildCache):
+    """Reloads the changed modules and every loaded module importing them,
+    each after the modules it imports. Modules that aren't loaded are left
+    to be imported fresh when a target needs them. This module and the build
+    cache keep running as they are, and edits to them need a restart."""
+    loaded = {}
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if (
+            name != "__main__"
+            and path
+            and Path(path).resolve().parent
+            in (
+                ROOT,
+                ROOT / MODELS_PACKAGE,
+            )
+        ):
+            loaded[Path(path).resolve()] = module
+    affected = [
+        path
+        for path in loaded
+        if path in changed or changed.intersection(cache.dependencies(path))
+    ]
+    # A module has more dependencies than anything it imports.
+    for path in sorted(affected, key=lambda path: len(cache.dependencies(path))):
+        if loaded[path].__name__ not in (__name__, BuildCache.__module__):
+            importlib.reload(loaded[path])
+        elif path in changed:
+            print(f"Restart to pick up changes to {path.name}.")
+
+
+def watch(names: list[str], cache: BuildCache, options: dict):
+    """Builds the named targets (or all of them), then rebuilds them in this
+    process whenever a module changes, until interrupted. Changed modules are
+    reloaded so the rebuild doesn't pay for starting Python again."""
+    mtimes = _source_mtimes()
+    build_changed(names or list(targets), cache, 1, options)
+    print("Watching for changes, Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(WATCH_INTERVAL)
+            current = _source_mtimes()
+            changed = {path for path in current if mtimes.get(path) != current[path]}
+            if not changed:
+                continue
+            mtimes = current
+            try:
+                _reload(changed, cache)
+                # Units keep their structural hash when library code changes.
+                render_cache.render_cache.clear()
+                load_targets()
+                build_changed(names or list(targets), cache, 1, options)
+            except Exception:
+                traceback.print_exc()
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Build crease pattern SVGs.")
+    parser.add_argument(
+        "targets", nargs="*", help="targets to build (default: all of them)"
+    )
+    parser.add_argument("--list", action="store_true", help="list the targets and exit")
+    parser.add_argument(
+        "--compress", action="store_true", help="write gzipped .svgz files"
+    )
+    parser.add_argument(
+        "--batch-paths",
+        action="store_true",
+        help="draw each style class as one combined path",
+    )
+    parser.add_argument(
+        "--precision",
+        type=float,
+        metavar="MM",
+        help="round lengths to steps of at most MM millimetres",
+    )
+    parser.add_argument(
+        "--relative-paths",
+        action="store_true",
+        help="write path data as offsets from the previous point",
+    )
+    parser.add_argument(
+        "--instance",
+        action="store_true",
+        help="render each distinct unit on a sheet once and <use> it",
+    )
+    parser.add_argument(
+        "--fundamental-domain",
+        action="store_true",
+        help="render the creases of one symmetry of each curved unit and "
+        "<use> them for the rest",
+    )
+    parser.add_argument(
+        "--tessellate",
+        action="store_true",
+        help="write one third of each hex grid and <use> it for the rest",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="number of worker processes (default: one per CPU, 1 to build "
+        "in this process)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="rebuild targets even if their inputs haven't changed",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and rebuild when models or library modules change",
+    )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const="traces",
+        metavar="DIR",
+        help="write a Chrome trace of each target built to DIR (default: "
+        f"traces, or ${TRACE_ENV}). Add --force to trace up to date targets.",
+    )
+    args = parser.parse_args(argv)
+
+    load_targets()
+    if args.list:
+        for name in targets:
+            print(name)
+        return
+    unknown = [name for name in args.targets if name not in targets]
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(unknown)}")
+
+    if args.trace:
+        # Through the environment too, so workers started without fork see it.
+        os.environ[TRACE_ENV] = args.trace
+        tracing.tracer.directory = Path(args.trace)
+    # Plain values, as they go into the build cache fingerprints.
+    options = {
+        "compress": args.compress,
+        "batch_paths": args.batch_paths,
+        "precision": args.precision,
+        "relative_paths": args.relative_paths,
+        "instance_units": args.instance,
+        "fundamental_domain": args.fundamental_domain,
+        "tessellate": args.tessellate,
+    }
+    cache = BuildCache(BUILD_CACHE_PATH)
+    if args.watch:
+        watch(args.targets, cache, options)
+        return
+    results = build_changed(
+        args.targets or list(targets), cache, args.jobs, options, args.force
+    )
+    if any(result.error for result in results):
+        sys.exit(1)
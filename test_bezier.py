@@ -0,0 +1,74 @@
+import math
+import random
+
+import numpy
+
+from bezier import Bezier
+from line import Line
+from vec import Vec
+
+
+def reference_intersections(bezier: Bezier, line: Line) -> list[float]:
+    # numpy's companion matrix solver, as used before the batched solver.
+    normal, d = line.as_vec_d()
+    coefficients = bezier._line_coefficients(
+        numpy.array([[normal.x, normal.y]]), numpy.array([d])
+    )[0]
+    return sorted(
+        r.real
+        for r in numpy.polynomial.Polynomial(coefficients).roots()
+        if abs(r.imag) < 1e-9 and 0 <= r.real <= 1
+    )
+
+
+def assert_same_roots(bezier: Bezier, lines: list[Line]):
+    for line, roots in zip(lines, bezier.intersections_many(lines)):
+        expected = reference_intersections(bezier, line)
+        assert len(roots) == len(expected), (line, roots, expected)
+        for root, expected_root in zip(roots, expected):
+            assert abs(root - expected_root) < 1e-9, (line, roots, expected)
+
+
+def test_lines_nearly_parallel_to_third_difference():
+    # Lines along P3 - 3 P2 + 3 P1 - P0 make the cubic term nearly vanish.
+    bezier = Bezier([Vec(0.75, 0.76), Vec(0.15, 1.35), Vec(0.28, 1.56), Vec(0.5, 1.9)])
+    p0, p1, p2, p3 = bezier.control_points
+    third_difference = p3 - p2 * 3 + p1 * 3 - p0
+    angle = math.atan2(third_difference.y, third_difference.x)
+    generator = random.Random(0)
+    lines = []
+    for i in range(800):
+        # Down to angles where the cubic term is rounding error.
+        direction_angle = angle + generator.uniform(-1, 1) * 10.0 ** -(i % 8 + 2)
+        direction = Vec(math.cos(direction_angle), math.sin(direction_angle))
+        point = bezier.at(generator.random())
+        lines.append(Line(point - direction, point + direction))
+    assert_same_roots(bezier, lines)
+
+
+def test_random_curves_and_lines():
+    generator = random.Random(1)
+
+    def point():
+        return Vec(generator.uniform(-1, 2), generator.uniform(-1, 2))
+
+    for _ in range(300):
+        bezier = Bezier([point() for _ in range(4)])
+        assert_same_roots(bezier, [Line(point(), point()) for _ in range(5)])
+
+
+def test_endpoint_on_line():
+    bezier = Bezier([Vec(0, 0), Vec(1, 1), Vec(2, 1), Vec(3, 0)])
+    assert bezier.intersections(Line(Vec(0, 0), Vec(3, 0))) == [0.0, 1.0]
+
+
+def test_loop_split_at_line_crossings():
+    line = Line(Vec(1, 0), Vec(0, 2))
+    bezier = Bezier([Vec(0, 0), Vec(4, 0), Vec(0, 3), Vec(0, 0)])
+    roots = bezier.intersections(line)
+    assert [round(t, 5) for t in roots] == [0.0985, 0.79164]
+    normal, d = line.as_vec_d()
+    before = bezier.split_at(roots[0])[0]
+    after = bezier.split_at(roots[1])[1]
+    for point in (before.control_points[-1], after.control_points[0]):
+        assert abs(normal.dot(point) - d) < 1e-9
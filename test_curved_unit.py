@@ -0,0 +1,103 @@
+import copy
+import pickle
+
+import pytest
+import svg
+
+from bezier import Bezier
+from curved_unit import TransformStackUnit, _operation
+from line import Line
+from matrix import identity
+from vec import Vec
+
+CENTRE = Vec(0.5, 1)
+CURVE = Bezier([Vec(0.5, 0), Vec(0.1, 0.6), Vec(0.4, 1.2), Vec(0.5, 2)])
+
+
+def unit_with(*folds: float, curve=CURVE) -> TransformStackUnit:
+    unit = TransformStackUnit(length_ratio=2)
+    unit.add_rotational_symmetry(CENTRE)
+    for x in folds:
+        unit.add_fold(Line(Vec(x, 0), Vec(x, 2)), CENTRE)
+    unit.add_bezier_crease(curve)
+    return unit
+
+
+def rendered(unit: TransformStackUnit) -> str:
+    return svg.G(elements=unit.render_elements(10, identity())).as_str()
+
+
+def test_update_operation_matches_building_from_scratch():
+    unit = unit_with(0.25, 0.1)
+    unit.update_operation(1, Line(Vec(0.3, 0), Vec(0.3, 2)), CENTRE)
+    assert rendered(unit) == rendered(unit_with(0.3, 0.1))
+    assert repr(unit.operations) == repr(unit_with(0.3, 0.1).operations)
+
+
+def test_remove_operation_matches_building_from_scratch():
+    unit = unit_with(0.25, 0.1)
+    unit.remove_operation(2)
+    assert rendered(unit) == rendered(unit_with(0.25))
+    assert len(unit.operations) == 3
+
+
+def test_replay_from_start_gives_the_same_creases():
+    unit = unit_with(0.25, 0.1)
+    before = rendered(unit)
+    unit.replay_from(0)
+    assert rendered(unit) == before
+
+
+class FailingUnit(TransformStackUnit):
+    @_operation
+    def add_crease_then_fail(self, bezier: Bezier):
+        TransformStackUnit.add_bezier_crease.__wrapped__(self, bezier)
+        raise ValueError("failed after adding creases")
+
+
+def test_failed_operation_is_undone_and_not_recorded():
+    unit = FailingUnit(length_ratio=2)
+    unit.add_rotational_symmetry(CENTRE)
+    unit.add_fold(Line(Vec(0.25, 0), Vec(0.25, 2)), CENTRE)
+    unit.add_bezier_crease(CURVE)
+    before = rendered(unit)
+    with pytest.raises(ValueError):
+        unit.add_crease_then_fail(CURVE)
+    assert len(unit.operations) == 3
+    assert rendered(unit) == before
+    unit.update_operation(1, Line(Vec(0.3, 0), Vec(0.3, 2)), CENTRE)
+    assert rendered(unit) == rendered(unit_with(0.3))
+
+
+def test_failed_update_leaves_the_unit_as_it_was():
+    unit = unit_with(0.25)
+    before = rendered(unit)
+    with pytest.raises(Exception):
+        unit.update_operation(2, None)
+    assert rendered(unit) == before
+    assert repr(unit.operations) == repr(unit_with(0.25).operations)
+
+
+def test_fork_keeps_the_units_apart():
+    unit = unit_with(0.25)
+    before = rendered(unit)
+    child = unit.fork()
+    child.add_fold(Line(Vec(0.1, 0), Vec(0.1, 2)), CENTRE)
+    unit.add_bezier_crease(Bezier([Vec(0, 0.5), Vec(1, 0.5), Vec(0, 1), Vec(1, 1)]))
+    assert len(child.operations) == 4
+    assert len(unit.operations) == 4
+    child.remove_operation(3)
+    unit.remove_operation(3)
+    assert rendered(child) == rendered(unit) == before
+    child.update_operation(1, Line(Vec(0.3, 0), Vec(0.3, 2)), CENTRE)
+    assert rendered(child) == rendered(unit_with(0.3))
+    assert rendered(unit) == before
+
+
+def test_deepcopy_unit():
+    unit = TransformStackUnit(length_ratio=2)
+    unit.add_rotational_symmetry(Vec(0.5, 1))
+    unit.add_fold(Line(Vec(0.25, 0), Vec(0.25, 2)), Vec(0.5, 1))
+    copied = copy.deepcopy(unit)
+    assert copied.structural_hash() == unit.structural_hash()
+    assert pickle.loads(pickle.dumps(unit)).structural_hash() == unit.structural_hash()
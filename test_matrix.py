@@ -0,0 +1,27 @@
+import copy
+import pickle
+
+import pytest
+
+from matrix import Matrix, offset_by, rotate_around_point
+from vec import Vec
+
+
+def test_immutable():
+    m = offset_by(Vec(1, 2))
+    with pytest.raises(AttributeError):
+        m.e = 5
+    with pytest.raises(AttributeError):
+        del m.f
+    assert offset_by(Vec(1, 2)) == Matrix(1, 0, 0, 1, 1, 2)
+
+
+def test_pickle_and_copy_round_trip():
+    m = rotate_around_point(Vec(0.5, 1), 90)
+    copies = [copy.copy(m), copy.deepcopy(m), copy.deepcopy([m, {m: m}])[0]]
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        copies.append(pickle.loads(pickle.dumps(m, protocol)))
+    for copied in copies:
+        assert copied == m
+        assert hash(copied) == hash(m)
+        assert type(copied) is Matrix
@@ -0,0 +1,27 @@
+import gzip
+
+import svg
+
+from model_file_writer import ModelFileWriter
+
+
+def page():
+    return svg.SVG(width=10, height=10, elements=[svg.Rect(width=5, height=5)])
+
+
+def test_unchanged_page_skipped(tmp_path):
+    ModelFileWriter(tmp_path, "model", compress=True).write_svg("a", page())
+    writer = ModelFileWriter(tmp_path, "model", compress=True)
+    writer.write_svg("a", page())
+    assert (writer.written, writer.skipped) == (0, 1)
+
+
+def test_corrupt_existing_file_replaced(tmp_path):
+    path = tmp_path / "model_a.svgz"
+    for corrupt in (b"not gzip", gzip.compress(b"<svg>")[:-6]):
+        path.write_bytes(corrupt)
+        writer = ModelFileWriter(tmp_path, "model", compress=True)
+        writer.write_svg("a", page())
+        assert (writer.written, writer.skipped) == (1, 0)
+        assert gzip.decompress(path.read_bytes()).decode() == str(page())
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["model_a.svgz"]
@@ -0,0 +1,51 @@
+import svg
+
+from path_batching import batch_paths
+
+
+def path_data(elements) -> list[str]:
+    return [e.as_dict()["d"].strip() for e in elements if type(e) is svg.Path]
+
+
+def test_joined_lines_share_a_stroke():
+    elements = [
+        svg.Line(class_=["cut"], x1=0, y1=0, x2=10, y2=0),
+        svg.Line(class_=["cut"], x1=10, y1=0, x2=10, y2=5),
+        svg.Line(class_=["cut"], x1=0, y1=5, x2=0, y2=0),
+    ]
+    assert path_data(batch_paths(elements)) == ["M 0 0 L 10 0 L 10 5 M 0 5 L 0 0"]
+
+
+def test_classes_get_their_own_paths():
+    elements = [
+        svg.Line(class_=["cut"], x1=0, y1=0, x2=10, y2=0),
+        svg.Line(class_=["valley"], x1=10, y1=0, x2=10, y2=5),
+    ]
+    assert path_data(batch_paths(elements)) == ["M 0 0 L 10 0", "M 10 0 L 10 5"]
+
+
+def test_rect_after_joined_line_starts_its_own_subpath():
+    elements = [
+        svg.Line(class_=["cut"], x1=0, y1=0, x2=10, y2=0),
+        svg.Rect(class_=["cut"], x=10, y=0, width=5, height=5),
+    ]
+    assert path_data(batch_paths(elements)) == [
+        "M 0 0 L 10 0 M 10 0 L 15 0 L 15 5 L 10 5 Z"
+    ]
+
+
+def test_closed_path_after_joined_line_starts_its_own_subpath():
+    closed = svg.Path(
+        class_=["cut"],
+        d=[svg.MoveTo(10, 0), svg.LineTo(15, 5), svg.LineTo(10, 5), svg.ClosePath()],
+    )
+    elements = [svg.Line(class_=["cut"], x1=0, y1=0, x2=10, y2=0), closed]
+    assert path_data(batch_paths(elements)) == ["M 0 0 L 10 0 M 10 0 L 15 5 L 10 5 Z"]
+
+
+def test_other_elements_pass_through_first():
+    kept = svg.Line(class_=["cut"], x1=0, y1=0, x2=1, y2=1, transform=[svg.Scale(2)])
+    elements = [svg.Line(class_=["cut"], x1=0, y1=0, x2=10, y2=0), [kept]]
+    batched = list(batch_paths(elements))
+    assert batched[0] is kept
+    assert path_data(batched) == ["M 0 0 L 10 0"]
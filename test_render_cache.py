@@ -0,0 +1,20 @@
+from matrix import identity
+from pockets import AutoPocket
+from render_cache import RenderCache
+from wireframe_unit import WireframeUnit
+
+
+def unit(length_ratio: float) -> WireframeUnit:
+    return WireframeUnit(length_ratio, AutoPocket(56, 1), AutoPocket(56, 1))
+
+
+def test_least_recently_used_entries_are_dropped():
+    cache = RenderCache(maxsize=2)
+    first, second, third = unit(2.0), unit(2.1), unit(2.2)
+    for u in (first, second, first, third):
+        cache.render(u, 10, identity())
+    assert (cache.hits, cache.misses) == (1, 3)
+    cache.render(first, 10, identity())
+    assert cache.hits == 2
+    cache.render(second, 10, identity())
+    assert cache.misses == 4
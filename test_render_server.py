@@ -0,0 +1,38 @@
+import pytest
+import svg
+
+from render_server import RequestError, _length, _sheet
+
+
+def test_lengths():
+    assert _length(30) == 30
+    assert _length("30mm") == svg.mm(30)
+    assert _length("1.5in") == svg.Length(1.5, "in")
+
+
+@pytest.mark.parametrize("value", [0, -5, "0mm", "-3mm", float("inf"), True, "3 m"])
+def test_bad_lengths_are_rejected(value):
+    with pytest.raises(RequestError):
+        _length(value)
+
+
+UNIT = {
+    "length_ratio": 3.05,
+    "p1": {"angle": 56.03, "con": 1},
+    "p2": {"angle": 56.03, "con": 1},
+}
+
+
+@pytest.mark.parametrize(
+    "request_",
+    [
+        {"sheet": "print", "unit": UNIT, "unit_count": 100000},
+        {"sheet": "print", "unit": UNIT, "unit_count": 2.5},
+        {"sheet": "print", "unit": UNIT, "width": -5},
+        {"sheet": "complex", "sheet_width": 1e9, "sheet_height": 5},
+        {"sheet": "complex", "sheet_width": 7, "sheet_height": "x"},
+    ],
+)
+def test_oversized_or_bad_requests_are_rejected(request_):
+    with pytest.raises(RequestError):
+        _sheet(request_)
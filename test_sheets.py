@@ -0,0 +1,36 @@
+import svg
+
+from matrix import offset_by
+from pockets import AutoPocket
+from sheets import _placed_units
+from vec import Vec
+from wireframe_unit import WireframeUnit
+
+
+def wireframe(length_ratio=3):
+    return WireframeUnit(length_ratio, AutoPocket(56, 1), AutoPocket(56, 1))
+
+
+def placed(*units):
+    placements = [(unit, offset_by(Vec(i * 10, 0))) for i, unit in enumerate(units)]
+    defs, *uses = _placed_units(placements, 10, instance_units=True)
+    return [symbol.id for symbol in defs.elements], [use.href for use in uses]
+
+
+def test_equal_units_share_a_symbol():
+    symbols, uses = placed(wireframe(), wireframe(), wireframe(4))
+    assert symbols == ["unit-0", "unit-1"]
+    assert uses == ["#unit-0", "#unit-0", "#unit-1"]
+
+
+def test_units_without_structural_hash():
+    class Unit:
+        length_ratio = 1
+
+        def render_elements(self, width, t, with_hints=False):
+            return [svg.Line(x1=0, y1=0, x2=width, y2=0)]
+
+    unit = Unit()
+    symbols, uses = placed(unit, Unit(), unit)
+    assert symbols == ["unit-0", "unit-1"]
+    assert uses == ["#unit-0", "#unit-1", "#unit-0"]
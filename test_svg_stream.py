@@ -0,0 +1,29 @@
+import pytest
+import svg
+
+from pockets import AutoPocket
+from sheets import render_complex_sheet, render_print_sheet
+from svg_format import OutputFormat
+from svg_stream import StreamedSVG
+from wireframe_unit import WireframeUnit
+
+UNIT = WireframeUnit(3.05, AutoPocket(56.03, 1), AutoPocket(56.03, 1))
+
+
+def test_sheets_can_be_written_twice():
+    for document in (
+        render_print_sheet(UNIT, svg.mm(30), 3),
+        render_complex_sheet([UNIT] * 3, [UNIT], 7, 5, 30),
+        render_print_sheet(UNIT, 30, 3, output_format=OutputFormat(0.1)).batched(),
+    ):
+        first = document.as_str()
+        assert "<line" in first or "<path" in first
+        assert document.as_str() == first
+
+
+def test_iterator_elements_are_written_once():
+    line = svg.Line(x1=0, y1=0, x2=1, y2=1)
+    document = StreamedSVG(iter([line]), width=1, height=1)
+    assert document.as_str() == svg.SVG(width=1, height=1, elements=[line]).as_str()
+    with pytest.raises(RuntimeError):
+        document.as_str()
@@ -0,0 +1,19 @@
+from pathlib import Path
+
+import targets
+from build_cache import ROOT, BuildCache
+
+
+def build_whirlo(folder: Path) -> str:
+    targets.load_targets()
+    whirlo = targets.targets["Whirlo"]
+    target = targets.Target(whirlo.name, whirlo.module, whirlo.function, folder)
+    target.build(instance_units=True)
+    return (folder / "Whirlo.svg").read_text()
+
+
+def test_sheet_options_apply_after_reload(tmp_path):
+    before = build_whirlo(tmp_path)
+    assert before.count("<symbol") == 2
+    targets._reload({ROOT / "vec.py"}, BuildCache(tmp_path / "cache.json"))
+    assert build_whirlo(tmp_path) == before
@@ -0,0 +1,19 @@
+import copy
+import pickle
+
+from vec import Vec
+
+
+def test_pickle_round_trip():
+    v = Vec(1.5, -2)
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        loaded = pickle.loads(pickle.dumps(v, protocol))
+        assert loaded == v
+        assert type(loaded) is Vec
+
+
+def test_copy_round_trip():
+    v = Vec(1.5, -2)
+    for copied in (copy.copy(v), copy.deepcopy(v), copy.deepcopy([v, {v: v}])[0]):
+        assert copied == v
+        assert type(copied) is Vec
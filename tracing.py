@@ -0,0 +1,101 @@
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from pathlib import Path
+
+# Set to a directory to write a trace of every target built into it.
+TRACE_ENV = "UNITSVG_TRACE"
+
+
+def element_count(elements) -> int:
+    """Number of elements in a nested list of them."""
+    if isinstance(elements, (list, tuple)):
+        return sum(element_count(e) for e in elements)
+    return 0 if elements is None else 1
+
+
+class Tracer:
+    """Collects timed spans while a target builds and writes them out as a
+    Chrome trace (chrome://tracing, Perfetto) named after the target.
+
+    Spans are only recorded inside target() with a directory set, and
+    everywhere else the instrumented code pays for one attribute check.
+    Sheets render their units lazily, as write_svg streams them out, so unit
+    rendering shows up nested in the write rather than the sheet function.
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = Path(directory) if directory else None
+        self.enabled = False
+        self._events: list[dict] = []
+
+    def record(self, name: str, start_ns: int, args: dict):
+        self._events.append(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": start_ns / 1000,
+                "dur": (time.perf_counter_ns() - start_ns) / 1000,
+                "pid": os.getpid(),
+                "tid": 0,
+                "args": args,
+            }
+        )
+
+    @contextmanager
+    def _span(self, name: str, args: dict):
+        start = time.perf_counter_ns()
+        try:
+            yield args
+        finally:
+            self.record(name, start, args)
+
+    def span(self, name: str, **args):
+        """Context manager timing its block. It gives the span's args, which
+        the block can add counts to."""
+        if not self.enabled:
+            return nullcontext(args)
+        return self._span(name, args)
+
+    @contextmanager
+    def target(self, name: str):
+        if self.directory is None:
+            yield
+            return
+        self.enabled = True
+        self._events = []
+        try:
+            with self._span(name, {}):
+                yield
+        finally:
+            self.enabled = False
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.directory / f"{name}.trace.json", "w") as f:
+                json.dump({"traceEvents": self._events}, f)
+            self._events = []
+
+
+tracer = Tracer(os.environ.get(TRACE_ENV))
+
+
+def traced(count=None):
+    """Records each call of the decorated function as a span. count(result),
+    if given, is stored as the span's element count."""
+
+    def decorator(function):
+        name = function.__qualname__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter_ns()
+            result = function(*args, **kwargs)
+            tracer.record(name, start, {"elements": count(result)} if count else {})
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,48 @@
+import svg
+
+# All geometry is drawn in plain floats in SVG user units, which are CSS px
+# (96 per inch). svg.Length values only appear at the edges: sheets convert
+# the widths they are given on entry, and write their own size back out in
+# the unit it was given in.
+PX_PER_UNIT = {
+    None: 1,
+    "px": 1,
+    "in": 96,
+    "cm": 96 / 2.54,
+    "mm": 96 / 25.4,
+    "pt": 96 / 72,
+    "pc": 16,
+}
+PX_PER_MM = PX_PER_UNIT["mm"]
+
+
+def mm(value: float) -> float:
+    """value millimetres in user units."""
+    return value * PX_PER_MM
+
+
+def to_px(length: svg.Length | float) -> float:
+    if isinstance(length, svg.Length):
+        return length.value * PX_PER_UNIT[length.unit]
+    return length
+
+
+class DocumentUnits:
+    """The unit a sheet's size was given in.
+
+    value() reads a length as a float in that unit, and length() turns one
+    back into an attribute for the root <svg>. Drawing uses to_px() instead.
+    Plain numbers are taken to be user units already.
+    """
+
+    def __init__(self, like: svg.Length | float):
+        self.unit = like.unit if isinstance(like, svg.Length) else None
+        self.scale = PX_PER_UNIT[self.unit]
+
+    def value(self, length: svg.Length | float) -> float:
+        if isinstance(length, svg.Length) and length.unit == self.unit:
+            return length.value
+        return to_px(length) / self.scale
+
+    def length(self, value: float) -> svg.Length | float:
+        return svg.Length(value, self.unit) if self.unit else value
@@ -1,9 +1,9 @@
-from pathlib import Path
 from typing import List
 import svg
 from model_file_writer import ModelFileWriter
+from targets import main, sheet
 from vec import Vec
-from line import Line
+from line import Line, l
 from matrix import *
 from sheets import *
 from pockets import *
@@ -22,55 +22,8 @@ class Frac:
         self.den = den
 
 
-svg.Length.__mul__ = lambda self, o: svg.Length(self.value * o, self.unit)
-svg.Length.__rmul__ = lambda self, o: svg.Length(self.value * o, self.unit)
-
-
-def add(self, o):
-    if o == 0:
-        return self
-    if self.value == 0:
-        return o
-    if self.unit != o.unit:
-        raise Exception()
-    return svg.Length(self.value + o.value, self.unit)
-
-
-svg.Length.__add__ = add
-svg.Length.__radd__ = add
-
-def sub(self, o):
-    if o == 0:
-        return self
-    if self.value == 0:
-        return o
-    if self.unit != o.unit:
-        raise Exception()
-    return svg.Length(self.value - o.value, self.unit)
-
-
-svg.Length.__sub__ = sub
-svg.Length.__rsub__ = sub
-
-
-def gt(self, o):
-    if self.unit != o.unit:
-        raise Exception()
-    return self.value > o.value
-
-
-test_line = Line(Vec(1, 0), Vec(0, 2))
-test_bezier = Bezier([Vec(0, 0), Vec(4, 0), Vec(0, 3), Vec(0, 0)])
-roots = test_bezier.intersections(test_line)
-intersects = [test_bezier.at(t) for t in roots]
-manual_intersects = [test_bezier.at(t) for t in [0.098503, 0.79164]]
-section1 = test_bezier.split_at(roots[0])[0]
-section2 = test_bezier.split_at(roots[1])[1]
-
-
-svg.Length.__gt__ = gt
-
-with open("transform_stack_unit.svg", "w") as f:
+@sheet("transform_stack_unit")
+def write_transform_stack_unit(writer: ModelFileWriter):
     unit = TransformStackUnit(length_ratio=4)
     centre = sum(unit.zones[0].verts, Vec(0, 0)) * (1 / len(unit.zones[0].verts))
     unit.add_rotational_symmetry(centre)
@@ -139,9 +92,11 @@ with open("transform_stack_unit.svg", "w") as f:
     unit.add_bezier_crease(Bezier([Vec(1, pocket_endpoint.y+.2), Vec(0.2, 1), Vec(0.1, 2), centre + Vec(0.3, -0.1)]))
     unit.add_bezier_crease(Bezier([Vec(1.5, pocket_endpoint.y+.4), Vec(0.2, 1), Vec(0.1, 2.1), centre + Vec(0.6, -0.3)]))"""
 
-    f.write(render_print_sheet(unit, 200, 6).as_str())
+    writer.write_svg("transform_stack_unit", render_print_sheet(unit, 200, 6))
+
 
-with open("simplified_curved_unit.svg", "w") as f:
+@sheet("simplified_curved_unit")
+def write_simplified_curved_unit(writer: ModelFileWriter):
     ratio = 3.4
     base_narrowing_multiplier = 0.95
     centre = Vec(0.5, ratio * 0.5)
@@ -222,10 +177,11 @@ with open("simplified_curved_unit.svg", "w") as f:
     unit.add_bezier_crease(Bezier([Vec(1, pocket_endpoint.y+.2), Vec(0.2, 1), Vec(0.1, 2), centre + Vec(0.3, -0.1)]))
     unit.add_bezier_crease(Bezier([Vec(1.5, pocket_endpoint.y+.4), Vec(0.2, 1), Vec(0.1, 2.1), centre + Vec(0.6, -0.3)]))"""
 
-    f.write(render_print_sheet(unit, 200, 6).as_str())
+    writer.write_svg("simplified_curved_unit", render_print_sheet(unit, 200, 6))
 
 
-with open("reversed_curved_unit.svg", "w") as f:
+@sheet("reversed_curved_unit")
+def write_reversed_curved_unit(writer: ModelFileWriter):
     ratio = 3.6
     base_narrowing_multiplier = 0.95
     centre = Vec(0.5, ratio * 0.5)
@@ -311,10 +267,11 @@ with open("reversed_curved_unit.svg", "w") as f:
     unit.add_bezier_crease(Bezier([Vec(1, pocket_endpoint.y+.2), Vec(0.2, 1), Vec(0.1, 2), centre + Vec(0.3, -0.1)]))
     unit.add_bezier_crease(Bezier([Vec(1.5, pocket_endpoint.y+.4), Vec(0.2, 1), Vec(0.1, 2.1), centre + Vec(0.6, -0.3)]))"""
 
-    f.write(render_print_sheet(unit, 200, 6).as_str())
+    writer.write_svg("reversed_curved_unit", render_print_sheet(unit, 200, 6))
 
 
-with open("new_curved_unit.svg", "w") as f:
+@sheet("new_curved_unit")
+def write_new_curved_unit(writer: ModelFileWriter):
     ratio = 5.5
     base_narrowing_multiplier = 0.9
     centre = Vec(0.5, ratio * 0.5)
@@ -400,7 +357,7 @@ with open("new_curved_unit.svg", "w") as f:
     unit.add_bezier_crease(Bezier([Vec(1, pocket_endpoint.y+.2), Vec(0.2, 1), Vec(0.1, 2), centre + Vec(0.3, -0.1)]))
     unit.add_bezier_crease(Bezier([Vec(1.5, pocket_endpoint.y+.4), Vec(0.2, 1), Vec(0.1, 2.1), centre + Vec(0.6, -0.3)]))"""
 
-    f.write(render_print_sheet(unit, 200, 8).as_str())
+    writer.write_svg("new_curved_unit", render_print_sheet(unit, 200, 8))
 
 """with open("FiveTwistedTetrahedra.svg", "w") as f:
     unit1 = WireframeUnit(138/30, LongTabPocket(Frac(1, 5), 0, Frac(2, 3)), NormalPocket(0, Frac(1, 2), 2))
@@ -408,13 +365,22 @@ with open("new_curved_unit.svg", "w") as f:
     sheet = InstructionSheet(units = [unit1, unit2])
     f.write(sheet.render(150, 30).as_str())"""
 
-with open("TriangleSeriesOctahedra2_InternalUnit.svg", "w") as f:
+
+@sheet("TriangleSeriesOctahedra2_InternalUnit")
+def write_triangleseriesoctahedra2_internalunit(writer: ModelFileWriter):
     internal_unit = WireframeUnit(3.05, AutoPocket(56.03, 1), AutoPocket(24.51, 0.25))
-    f.write(render_print_sheet(internal_unit, svg.mm(30), 6).as_str())
+    writer.write_svg(
+        "TriangleSeriesOctahedra2_InternalUnit", render_print_sheet(internal_unit, svg.mm(30), 6)
+    )
 
-with open("TriangleSeriesOctahedra2_TriangleUnit.svg", "w") as f:
+
+@sheet("TriangleSeriesOctahedra2_TriangleUnit")
+def write_triangleseriesoctahedra2_triangleunit(writer: ModelFileWriter):
     triangle_unit = WireframeUnit(3.73, AutoPocket(37.95, 0), AutoPocket(30, 0))
-    f.write(render_print_sheet(triangle_unit, svg.mm(30), 6).as_str())
+    writer.write_svg(
+        "TriangleSeriesOctahedra2_TriangleUnit", render_print_sheet(triangle_unit, svg.mm(30), 6)
+    )
+
 
 POCKET_EDGE = -2
 POCKET_BOOKCASE = -1
@@ -422,7 +388,9 @@ CENTRE = 0
 BOOKCASE = 1
 EDGE = 2
 
-with open("5Icosahedra_sharper_AllUnitSheet.svg", "w") as f:
+
+@sheet("5Icosahedra_sharper")
+def write_5icosahedra_sharper(writer: ModelFileWriter):
     triangle_unit = WireframeUnit(
         4.09, AutoPocket(38.17, 0.33, extra=40.22).with_hint_from(POCKET_EDGE), 
         AutoPocket(45.79, 0.5, extra=38.17).with_hint_from(POCKET_EDGE),
@@ -439,28 +407,29 @@ with open("5Icosahedra_sharper_AllUnitSheet.svg", "w") as f:
         name="Symmetrical", count=30
     )
 
-    f.write(
+    writer.write_svg(
+        "5Icosahedra_sharper_AllUnitSheet",
         render_complex_sheet(
             [*([symmetrical_unit] * 2), *([odd_unit] * 2), *([triangle_unit] * 3)],
             [triangle_unit, odd_unit, odd_unit],
             7,
             odd_unit.length_ratio + 3,
             svg.mm(30),
-        ).as_str()
+        ),
     )
 
-    with open("5Icosahedra_Cheatsheet.svg", "w") as cheatsheet:
-        cheatsheet.write(
-            render_cheatsheet(
-                [triangle_unit, odd_unit, symmetrical_unit],
-                svg.mm(40),
-                svg.mm(30),
-            ).as_str()
-        )
-
+    writer.write_svg(
+        "5Icosahedra_Cheatsheet",
+        render_cheatsheet(
+            [triangle_unit, odd_unit, symmetrical_unit],
+            svg.mm(40),
+            svg.mm(30),
+        ),
+    )
 
 
-with open("TriangleSeriesIcosahedra2_Cheatsheet.svg", "w") as f:
+@sheet("TriangleSeriesIcosahedra2")
+def write_triangleseriesicosahedra2(writer: ModelFileWriter):
     triangle_unit = WireframeUnit(
         3.76,
         AutoPocket(42.25, 0.333).with_hint_from(POCKET_EDGE),
@@ -475,15 +444,18 @@ with open("TriangleSeriesIcosahedra2_Cheatsheet.svg", "w") as f:
         name="Star",
         count=60,
     )
-    f.write(
+    writer.write_svg(
+        "TriangleSeriesIcosahedra2_Cheatsheet",
         render_cheatsheet(
             [triangle_unit, star_unit],
             svg.mm(40),
             svg.mm(25),
-        ).as_str()
+        ),
     )
 
-with open("Pincers_Cheatsheet.svg", "w") as f:
+
+@sheet("Pincers")
+def write_pincers(writer: ModelFileWriter):
     trivert_unit = WireframeUnit(
         3.16,
         AutoPocket(83.47, 6).with_hint_from(POCKET_EDGE),
@@ -498,30 +470,34 @@ with open("Pincers_Cheatsheet.svg", "w") as f:
         name="Long",
         count=12,
     )
-    f.write(
+    writer.write_svg(
+        "Pincers_Cheatsheet",
         render_cheatsheet(
             [trivert_unit, long_unit],
             svg.mm(40),
             svg.mm(25),
-        ).as_str()
+        ),
     )
 
 
-with open("PentagonThing_AllUnitSheet.svg", "w") as f:
+@sheet("PentagonThing")
+def write_pentagonthing(writer: ModelFileWriter):
     pentagon_unit = WireframeUnit(1.65, AutoPocket(55.83, 0.33), AutoPocket(49.67, 0.5))
     odd_unit = WireframeUnit(4.49, AutoPocket(66.09, 0.33), AutoPocket(55, 0.25))
-    f.write(
+    writer.write_svg(
+        "PentagonThing_AllUnitSheet",
         render_complex_sheet(
             [*([odd_unit] * 1), *([pentagon_unit] * 6)],
             [odd_unit] * 5,
             7,
             odd_unit.length_ratio + 3,
             svg.mm(30),
-        ).as_str()
+        ),
     )
 
 
-with open("5Dodecahedra_AllUnitSheet.svg", "w") as f:
+@sheet("5Dodecahedra")
+def write_5dodecahedra(writer: ModelFileWriter):
     large_tri_unit = WireframeUnit(
         2.88, 
         AutoPocket(71.23, 1.5, extra=44.38).with_hint_to(POCKET_BOOKCASE), 
@@ -541,7 +517,8 @@ with open("5Dodecahedra_AllUnitSheet.svg", "w") as f:
         name = "Inner tri-vertex", count=60
     )
 
-    f.write(
+    writer.write_svg(
+        "5Dodecahedra_AllUnitSheet",
         render_complex_sheet(
             [*([symmetrical_unit] * 3), *([large_tri_unit] * 6)],
             [small_tri_unit] * 8,
@@ -553,19 +530,21 @@ with open("5Dodecahedra_AllUnitSheet.svg", "w") as f:
                 ([large_tri_unit] * 6, Vec(3, large_tri_unit.length_ratio)),
                 ([small_tri_unit] * 4, Vec(3, large_tri_unit.length_ratio * 2)),
             ],
-        ).as_str()
+        ),
+    )
+
+    writer.write_svg(
+        "5Dodecahedra_Cheatsheet",
+        render_cheatsheet(
+            [large_tri_unit, small_tri_unit, symmetrical_unit],
+            svg.mm(40),
+            svg.mm(30),
+        ),
     )
 
-    with open("5Dodecahedra_Cheatsheet.svg", "w") as cheatsheet:
-        cheatsheet.write(
-            render_cheatsheet(
-                [large_tri_unit, small_tri_unit, symmetrical_unit],
-                svg.mm(40),
-                svg.mm(30),
-            ).as_str()
-        )
 
-with open("Flowers_WhirlSheet.svg", "w") as f:
+@sheet("Flowers_Whirl")
+def write_flowers_whirl(writer: ModelFileWriter):
     small_unit = WireframeUnit(
         1.9, AutoPocket(60.18, 1, extra=53.88), AutoPocket(45.61, 0.6666, extra=57.90)
     )
@@ -573,7 +552,8 @@ with open("Flowers_WhirlSheet.svg", "w") as f:
         2.57, AutoPocket(54.41, 1, extra=45.61), AutoPocket(57.90, 1, extra=54.41)
     )
 
-    f.write(
+    writer.write_svg(
+        "Flowers_WhirlSheet",
         render_complex_sheet(
             [small_unit] * 10,
             [],
@@ -581,15 +561,18 @@ with open("Flowers_WhirlSheet.svg", "w") as f:
             210 / 29,  # 203mm
             svg.mm(29),
             extra_vertical_units=[([large_unit] * 10, Vec(0, small_unit.length_ratio))],
-        ).as_str()
+        ),
     )
 
-with open("Flowers_PentagonSheet.svg", "w") as f:
+
+@sheet("Flowers_Pentagon")
+def write_flowers_pentagon(writer: ModelFileWriter):
     pentagon_unit = WireframeUnit(
         1.46, AutoPocket(55.71, 1, extra=60.18), AutoPocket(53.88, 1, extra=55.71)
     )
 
-    f.write(
+    writer.write_svg(
+        "Flowers_PentagonSheet",
         render_complex_sheet(
             [pentagon_unit] * 10,
             [],
@@ -600,11 +583,12 @@ with open("Flowers_PentagonSheet.svg", "w") as f:
                 ([pentagon_unit] * 10, Vec(0, pentagon_unit.length_ratio * i))
                 for i in range(1, 0)
             ],
-        ).as_str()
+        ),
     )
 
 
-with open("MiniKaleidoscope_AllUnitSheet.svg", "w") as f:
+@sheet("MiniKaleidoscope")
+def write_minikaleidoscope(writer: ModelFileWriter):
     pentagon_unit = WireframeUnit(
         1.09, AutoPocket(54.93, 1.5), AutoPocket(35.56, 0.3333, extra=54.93)
     )
@@ -612,7 +596,8 @@ with open("MiniKaleidoscope_AllUnitSheet.svg", "w") as f:
         2.35, AutoPocket(64.64, .66666, extra=35.56), AutoPocket(64.64, .66666, extra=35.56)
     )
 
-    f.write(
+    writer.write_svg(
+        "MiniKaleidoscope_AllUnitSheet",
         render_complex_sheet(
             [pentagon_unit] * 5,
             [],
@@ -621,11 +606,12 @@ with open("MiniKaleidoscope_AllUnitSheet.svg", "w") as f:
             svg.mm(25),
             extra_vertical_units=[([pentagon_unit] * 5, Vec(0, pentagon_unit.length_ratio)),
                                   ([long_unit] * 5, Vec(0, pentagon_unit.length_ratio * 2))],
-        ).as_str()
+        ),
     )
 
 
-with open("MiniKaleidoscope2_AllUnitSheet.svg", "w") as f:
+@sheet("MiniKaleidoscope2")
+def write_minikaleidoscope2(writer: ModelFileWriter):
     pentagon_unit = WireframeUnit(
         3.90, AutoPocket(44.52, 1, extra=54, double_extra=False), AutoPocket(54, 0.5, extra=24.68, double_extra=False)
     )
@@ -633,7 +619,8 @@ with open("MiniKaleidoscope2_AllUnitSheet.svg", "w") as f:
         3.51, AutoPocket(24.68, 0.25, extra=44.52, double_extra=False), AutoPocket(24.68, 0.25, extra=44.52, double_extra=False)
     )
 
-    f.write(
+    writer.write_svg(
+        "MiniKaleidoscope2_AllUnitSheet",
         render_complex_sheet(
             [pentagon_unit] * 5,
             [],
@@ -642,10 +629,12 @@ with open("MiniKaleidoscope2_AllUnitSheet.svg", "w") as f:
             svg.mm(22),
             extra_vertical_units=[([pentagon_unit] * 5, Vec(0, pentagon_unit.length_ratio)),
                                   ([long_unit] * 5, Vec(0, pentagon_unit.length_ratio * 2))],
-        ).as_str()
+        ),
     )
 
-with open("Braids_AllUnitSheet.svg", "w") as f:
+
+@sheet("Braids")
+def write_braids(writer: ModelFileWriter):
     long_unit = WireframeUnit(
         5.54, AutoPocket(66.08, 1, extra=61.04), AutoPocket(57.95, 1, extra=57.95)
     )
@@ -653,7 +642,8 @@ with open("Braids_AllUnitSheet.svg", "w") as f:
         3.55, AutoPocket(61.04, 1, extra=66.08), AutoPocket(61.04, 1, extra=66.08)
     )
 
-    f.write(
+    writer.write_svg(
+        "Braids_AllUnitSheet",
         render_complex_sheet(
             [short_unit] * 2,
             [long_unit] * 10 + [short_unit],
@@ -661,10 +651,12 @@ with open("Braids_AllUnitSheet.svg", "w") as f:
             11,  # 203mm
             svg.mm(26), #286mm
             extra_vertical_units=[([short_unit] * 2, Vec(0, short_unit.length_ratio))],
-        ).as_str()
+        ),
     )
 
-with open("Braids_b_AllUnitSheet.svg", "w") as f:
+
+@sheet("Braids_b")
+def write_braids_b(writer: ModelFileWriter):
     asymm_unit = WireframeUnit(
         2.67, AutoPocket(57.28, 1, extra=62.80), AutoPocket(64.61, 1, extra=64.61)
     )
@@ -695,7 +687,8 @@ with open("Braids_b_AllUnitSheet.svg", "w") as f:
         ).as_str()
     )"""
 
-    f.write(
+    writer.write_svg(
+        "Braids_b_AllUnitSheet",
         render_complex_sheet(
             [symm_unit] * 5 + [asymm_unit] * 4,
             [],
@@ -703,18 +696,20 @@ with open("Braids_b_AllUnitSheet.svg", "w") as f:
             11,  # 203mm
             svg.mm(26), #286mm
             extra_vertical_units=[([asymm_unit] * 8, Vec(0, symm_unit.length_ratio))],
-        ).as_str()
+        ),
     )
 
 
-with open("Braids_c_AllUnitSheet.svg", "w") as f:
+@sheet("Braids_c")
+def write_braids_c(writer: ModelFileWriter):
     asymm_unit = WireframeUnit(
         4.63, AutoPocket(49.45, 1, extra=66.76), AutoPocket(54.85, 1, extra=54.85)
     )
     symm_unit = WireframeUnit(
         2.43, AutoPocket(66.76, 1, extra=49.45), AutoPocket(66.76, 1, extra=49.45)
     )
-    f.write(
+    writer.write_svg(
+        "Braids_c_AllUnitSheet",
         render_complex_sheet(
             [symm_unit] * 2,
             [asymm_unit] * 10,
@@ -723,19 +718,20 @@ with open("Braids_c_AllUnitSheet.svg", "w") as f:
             svg.mm(29), #286mm
             extra_vertical_units=[([symm_unit] * 2, Vec(0, symm_unit.length_ratio)),
                                    ([symm_unit], Vec(0, symm_unit.length_ratio * 2))],
-        ).as_str()
+        ),
     )
 
 
-
-with open("Whirlo_smallsheet.svg", "w") as f:
+@sheet("Whirlo_smallsheet")
+def write_whirlo_smallsheet(writer: ModelFileWriter):
     pentagon_unit = WireframeUnit(
         2.39, AutoPocket(62.50, 1), AutoPocket(54.0, 1)
     )
     outer_unit = WireframeUnit(
         1.65, AutoPocket(44.25, 0.6666), AutoPocket(53.44, 1)
     )
-    f.write(
+    writer.write_svg(
+        "Whirlo_smallsheet",
         render_complex_sheet(
             [pentagon_unit] * 10,
             [],
@@ -743,17 +739,20 @@ with open("Whirlo_smallsheet.svg", "w") as f:
             (140 - 10) / 27,  # 203mm
             svg.mm(27), #286mm
             extra_vertical_units=[([outer_unit] * 10, Vec(0, pentagon_unit.length_ratio))]
-        ).as_str()
+        ),
     )
 
-with open("Whirlo.svg", "w") as f:
+
+@sheet("Whirlo")
+def write_whirlo(writer: ModelFileWriter):
     pentagon_unit = WireframeUnit(
         2.39, AutoPocket(62.50, 1), AutoPocket(54.0, 1)
     )
     outer_unit = WireframeUnit(
         1.65, AutoPocket(44.25, 0.6666), AutoPocket(53.44, 1)
     )
-    f.write(
+    writer.write_svg(
+        "Whirlo",
         render_complex_sheet(
             [pentagon_unit] * 10,
             [],
@@ -763,31 +762,40 @@ with open("Whirlo.svg", "w") as f:
             extra_vertical_units=[([pentagon_unit] * 10, Vec(0, pentagon_unit.length_ratio)),
             ([outer_unit] * 10, Vec(0, pentagon_unit.length_ratio*2)),
             ([outer_unit] * 10, Vec(0, pentagon_unit.length_ratio *2 + outer_unit.length_ratio))]
-        ).as_str()
+        ),
     )
 
-with open("Hex32.svg", "w") as f:
-    f.write(render_hex_grid(32, 10).as_str())
 
-with open("Hex48.svg", "w") as f:
-    f.write(render_hex_grid(48, 10).as_str())
+@sheet("Hex32")
+def write_hex32(writer: ModelFileWriter):
+    writer.write_svg("Hex32", render_hex_grid(32, 10))
 
 
-with open("Hex40.svg", "w") as f:
-    f.write(render_hex_grid(40, 10).as_str())
+@sheet("Hex48")
+def write_hex48(writer: ModelFileWriter):
+    writer.write_svg("Hex48", render_hex_grid(48, 10))
 
-with open("Hex24.svg", "w") as f:
-    f.write(render_hex_grid(24, 10).as_str())
 
+@sheet("Hex40")
+def write_hex40(writer: ModelFileWriter):
+    writer.write_svg("Hex40", render_hex_grid(40, 10))
 
-with open("5twistedrons.svg", "w") as f:
+
+@sheet("Hex24")
+def write_hex24(writer: ModelFileWriter):
+    writer.write_svg("Hex24", render_hex_grid(24, 10))
+
+
+@sheet("5twistedrons")
+def write_5twistedrons(writer: ModelFileWriter):
     triangle_unit = WireframeUnit(
         6.61, AutoPocket(32.39, 0.2, extra=30, double_extra=False), AutoPocket(30, 0.5, extra=54.65)
     )
     connector_unit = WireframeUnit(
         5.62, AutoPocket(44.76, 0.5, extra=44.76, double_extra=False), AutoPocket(54.65, 0.75, extra=32.39, double_extra=False)
     )
-    f.write(
+    writer.write_svg(
+        "5twistedrons",
         render_complex_sheet(
             [triangle_unit] * 4 + [connector_unit] * 4,
             [],
@@ -795,41 +803,46 @@ with open("5twistedrons.svg", "w") as f:
             (216 - 5) / 30,  # 203mm
             svg.mm(30), #286mm
             extra_vertical_units=[]
-        ).as_str()
+        ),
     )
 
-with open("pentathingo_inside.svg", "w") as f_i:
-    with open("pentathingo_pentagon.svg", "w") as f_p:
-        pentagon_unit = WireframeUnit(
-            1.74, AutoPocket(54, 0.333, extra=36.15, double_extra=False), AutoPocket(48.09, 0.8, extra=54, double_extra=False)
-        )
-        tri_unit = WireframeUnit(
-            2.56, AutoPocket(36.15, 0.333, extra=48.09, double_extra=False), AutoPocket(60.17, 1, extra=60.17, double_extra=True)
-        )
-        w = 29
-        f_i.write(
-            render_complex_sheet(
-                [tri_unit] * 6,
-                [],
-                (297 - 5) / w,
-                (210 - 5) / w,  # 203mm
-                svg.mm(w), #286mm
-                extra_vertical_units=[([tri_unit] * 6, Vec(0, tri_unit.length_ratio))]
-            ).as_str()
-        )
-        f_p.write(
-            render_complex_sheet(
-                [pentagon_unit] * 10,
-                [],
-                (297 - 5) / w,
-                (210 - 5) / w,  # 203mm
-                svg.mm(w), #286mm
-                extra_vertical_units=[([pentagon_unit] * 10, Vec(0, pentagon_unit.length_ratio)),
-                                      ([pentagon_unit] * 10, Vec(0, pentagon_unit.length_ratio*2))]
-            ).as_str()
-        )
 
-with open("TwistedTriangularPrisms.svg", "w") as f:
+@sheet("pentathingo")
+def write_pentathingo(writer: ModelFileWriter):
+    pentagon_unit = WireframeUnit(
+        1.74, AutoPocket(54, 0.333, extra=36.15, double_extra=False), AutoPocket(48.09, 0.8, extra=54, double_extra=False)
+    )
+    tri_unit = WireframeUnit(
+        2.56, AutoPocket(36.15, 0.333, extra=48.09, double_extra=False), AutoPocket(60.17, 1, extra=60.17, double_extra=True)
+    )
+    w = 29
+    writer.write_svg(
+        "pentathingo_inside",
+        render_complex_sheet(
+            [tri_unit] * 6,
+            [],
+            (297 - 5) / w,
+            (210 - 5) / w,  # 203mm
+            svg.mm(w), #286mm
+            extra_vertical_units=[([tri_unit] * 6, Vec(0, tri_unit.length_ratio))]
+        ),
+    )
+    writer.write_svg(
+        "pentathingo_pentagon",
+        render_complex_sheet(
+            [pentagon_unit] * 10,
+            [],
+            (297 - 5) / w,
+            (210 - 5) / w,  # 203mm
+            svg.mm(w), #286mm
+            extra_vertical_units=[([pentagon_unit] * 10, Vec(0, pentagon_unit.length_ratio)),
+                                  ([pentagon_unit] * 10, Vec(0, pentagon_unit.length_ratio*2))]
+        ),
+    )
+
+
+@sheet("TwistedTriangularPrisms")
+def write_twistedtriangularprisms(writer: ModelFileWriter):
     connector_unit = WireframeUnit(
         1.79, AutoPocket(38.46, 0.5, extra=38.25, double_extra=False), AutoPocket(54.65, .75, extra=51.51, double_extra=False)
     )
@@ -839,7 +852,8 @@ with open("TwistedTriangularPrisms.svg", "w") as f:
     triangle2_unit = WireframeUnit(
         3.11, AutoPocket(30, 0.333, extra=51.78, double_extra=False), AutoPocket(51.51, .75, extra=30, double_extra=False)
     )
-    f.write(
+    writer.write_svg(
+        "TwistedTriangularPrisms",
         render_complex_sheet(
             [connector_unit] * 3 + [triangle1_unit] * 3,
             [],
@@ -847,218 +861,226 @@ with open("TwistedTriangularPrisms.svg", "w") as f:
             (216 - 5) / 35,  # 203mm
             svg.mm(35), #286mm
             extra_vertical_units=[([triangle2_unit] * 3, Vec(0, connector_unit.length_ratio))]
-        ).as_str()
+        ),
     )
 
-with open("Bauble_tri.svg", "w") as f:
-    with open("Bauble_connector.svg", "w") as f2:
-        tri_unit = WireframeUnit(
-            2.35, AutoPocket(57.01, 1, extra=57.01, double_extra=True), AutoPocket(55.40, 0.75, extra=47.55, double_extra=False)
-        )
-        connector_unit = WireframeUnit(
-            4.23, AutoPocket(47.55, 0.6, extra=55.40, double_extra=False), AutoPocket(47.55, 0.6, extra=55.40, double_extra=False)
-        )
-        height = (210 - 5) / 30
-        width = (297 - 5) / 30
-        f.write(
-            render_complex_sheet(
-                [],
-                [tri_unit] * 6,
-                width, 
-                height,
-                svg.mm(30),
-                extra_vertical_units=[([tri_unit] * 2, Vec(width - tri_unit.length_ratio - 2 , height - tri_unit.length_ratio * 2)),
-                                      ([tri_unit] * 2, Vec(width - tri_unit.length_ratio - 2, height - tri_unit.length_ratio))]
-            ).as_str()
-        )
-        f2.write(
-            render_complex_sheet(
-                [connector_unit] * 5,
-                [],
-                (210 - 5) / 30,
-                (297 - 5) / 30, 
-                svg.mm(30),
-                extra_vertical_units=[([connector_unit] * 5, Vec(0, connector_unit.length_ratio))]
-            ).as_str()
-        )
 
+@sheet("Bauble")
+def write_bauble(writer: ModelFileWriter):
+    tri_unit = WireframeUnit(
+        2.35, AutoPocket(57.01, 1, extra=57.01, double_extra=True), AutoPocket(55.40, 0.75, extra=47.55, double_extra=False)
+    )
+    connector_unit = WireframeUnit(
+        4.23, AutoPocket(47.55, 0.6, extra=55.40, double_extra=False), AutoPocket(47.55, 0.6, extra=55.40, double_extra=False)
+    )
+    height = (210 - 5) / 30
+    width = (297 - 5) / 30
+    writer.write_svg(
+        "Bauble_tri",
+        render_complex_sheet(
+            [],
+            [tri_unit] * 6,
+            width, 
+            height,
+            svg.mm(30),
+            extra_vertical_units=[([tri_unit] * 2, Vec(width - tri_unit.length_ratio - 2 , height - tri_unit.length_ratio * 2)),
+                                  ([tri_unit] * 2, Vec(width - tri_unit.length_ratio - 2, height - tri_unit.length_ratio))]
+        ),
+    )
+    writer.write_svg(
+        "Bauble_connector",
+        render_complex_sheet(
+            [connector_unit] * 5,
+            [],
+            (210 - 5) / 30,
+            (297 - 5) / 30, 
+            svg.mm(30),
+            extra_vertical_units=[([connector_unit] * 5, Vec(0, connector_unit.length_ratio))]
+        ),
+    )
 
-with open("triangleweave_tri.svg", "w") as f:
-    with open("triangleweave_connector.svg", "w") as f2:
-        with open("triangleweave_connector_b.svg", "w") as f3:
-            tri_unit = WireframeUnit(
-                1.69, AutoPocket(30, .25, extra=44.3, double_extra=False), AutoPocket(64.44, .75, extra=30, double_extra=False)
-            )
-            connector_unit = WireframeUnit(
-                3.27, AutoPocket(44.3, .75, extra=64.44, double_extra=True), AutoPocket(44.3, .75, extra=64.44, double_extra=True)
-            )
-            width = (297 - 5) / 30
-            f.write(
-                render_complex_sheet(
-                    [tri_unit] * 2,
-                    [],
-                    2,
-                    tri_unit.length_ratio * 5, 
-                    30 * 72/25.4, #svg.mm(30),
-                    extra_vertical_units=[([tri_unit] * 2, Vec(0, tri_unit.length_ratio * 1)),
-                                          ([tri_unit] * 2, Vec(0, tri_unit.length_ratio * 2)),
-                                          ([tri_unit] * 2, Vec(0, tri_unit.length_ratio * 3)),
-                                        ([tri_unit] * 2, Vec(0, tri_unit.length_ratio * 4))]
-                ).as_str()
-            )
-            f2.write( #19
-                render_complex_sheet(
-                    [connector_unit] * 6,
-                    [connector_unit] * 7,
-                    width,
-                    220 / 30, 
-                    svg.mm(30),
-                    extra_vertical_units=[([connector_unit] * 6, Vec(0, connector_unit.length_ratio))]
-                ).as_str()
-            )
-            f3.write(
-                render_complex_sheet(
-                    [connector_unit] * 6,
-                    [connector_unit] * 5,
-                    width,
-                    150/30, 
-                    svg.mm(30)
-                ).as_str()
-            )
-
-with open("pentagonweave_p.svg", "w") as f:
-    with open("pentagonweave_connector.svg", "w") as f2:
-        tri_unit = WireframeUnit(
-            1.18, AutoPocket(68.82, 1.5, extra=54, double_extra=False), AutoPocket(54, 0.6666, extra=36.48, double_extra=False)
-        )
-        connector_unit = WireframeUnit(
-            2.53, AutoPocket(36.48, 0.6, extra=68.82, double_extra=True), AutoPocket(36.48, 0.6, extra=68.82, double_extra=True)
-        )
-        unit_mm = 31
-        width = 310 / unit_mm
-        height = (297 - 5) / unit_mm
-        f.write(
-            render_complex_sheet(
-                [tri_unit] * 10,
-                [],
-                width,
-                height, 
-                unit_mm * mm_ratio, #svg.mm(30),
-                extra_vertical_units=[([tri_unit] * 10, Vec(0, tri_unit.length_ratio * i)) for i in range(1, 6)]
-            ).as_str()
-        )
-        f2.write( #19
-            render_complex_sheet(
-                [connector_unit] * 2,
-                [connector_unit] * 9,
-                2 + connector_unit.length_ratio,
-                9, 
-                unit_mm * mm_ratio,
-                extra_vertical_units=[([connector_unit] * 2, Vec(0, connector_unit.length_ratio)),
-                                      ([connector_unit] * 2, Vec(0, connector_unit.length_ratio*2))]
-            ).as_str()
-        )
+
+@sheet("triangleweave")
+def write_triangleweave(writer: ModelFileWriter):
+    tri_unit = WireframeUnit(
+        1.69, AutoPocket(30, .25, extra=44.3, double_extra=False), AutoPocket(64.44, .75, extra=30, double_extra=False)
+    )
+    connector_unit = WireframeUnit(
+        3.27, AutoPocket(44.3, .75, extra=64.44, double_extra=True), AutoPocket(44.3, .75, extra=64.44, double_extra=True)
+    )
+    width = (297 - 5) / 30
+    writer.write_svg(
+        "triangleweave_tri",
+        render_complex_sheet(
+            [tri_unit] * 2,
+            [],
+            2,
+            tri_unit.length_ratio * 5, 
+            30 * 72/25.4, #svg.mm(30),
+            extra_vertical_units=[([tri_unit] * 2, Vec(0, tri_unit.length_ratio * 1)),
+                                  ([tri_unit] * 2, Vec(0, tri_unit.length_ratio * 2)),
+                                  ([tri_unit] * 2, Vec(0, tri_unit.length_ratio * 3)),
+                                ([tri_unit] * 2, Vec(0, tri_unit.length_ratio * 4))]
+        ),
+    )
+    #19
+    writer.write_svg(
+        "triangleweave_connector",
+        render_complex_sheet(
+            [connector_unit] * 6,
+            [connector_unit] * 7,
+            width,
+            220 / 30, 
+            svg.mm(30),
+            extra_vertical_units=[([connector_unit] * 6, Vec(0, connector_unit.length_ratio))]
+        ),
+    )
+    writer.write_svg(
+        "triangleweave_connector_b",
+        render_complex_sheet(
+            [connector_unit] * 6,
+            [connector_unit] * 5,
+            width,
+            150/30, 
+            svg.mm(30)
+        ),
+    )
+
+
+@sheet("pentagonweave")
+def write_pentagonweave(writer: ModelFileWriter):
+    tri_unit = WireframeUnit(
+        1.18, AutoPocket(68.82, 1.5, extra=54, double_extra=False), AutoPocket(54, 0.6666, extra=36.48, double_extra=False)
+    )
+    connector_unit = WireframeUnit(
+        2.53, AutoPocket(36.48, 0.6, extra=68.82, double_extra=True), AutoPocket(36.48, 0.6, extra=68.82, double_extra=True)
+    )
+    unit_mm = 31
+    width = 310 / unit_mm
+    height = (297 - 5) / unit_mm
+    writer.write_svg(
+        "pentagonweave_p",
+        render_complex_sheet(
+            [tri_unit] * 10,
+            [],
+            width,
+            height, 
+            unit_mm * mm_ratio, #svg.mm(30),
+            extra_vertical_units=[([tri_unit] * 10, Vec(0, tri_unit.length_ratio * i)) for i in range(1, 6)]
+        ),
+    )
+    #19
+    writer.write_svg(
+        "pentagonweave_connector",
+        render_complex_sheet(
+            [connector_unit] * 2,
+            [connector_unit] * 9,
+            2 + connector_unit.length_ratio,
+            9, 
+            unit_mm * mm_ratio,
+            extra_vertical_units=[([connector_unit] * 2, Vec(0, connector_unit.length_ratio)),
+                                  ([connector_unit] * 2, Vec(0, connector_unit.length_ratio*2))]
+        ),
+    )
+
+
+@sheet("stackweave")
+def write_stackweave(writer: ModelFileWriter):
+    tri_unit = WireframeUnit(
+        2.54, AutoPocket(30, 0.25, extra=45.14, double_extra=False), AutoPocket(58.11, .8, extra=30, double_extra=False)
+    )
+    tri_connector_unit = WireframeUnit(
+        3.88, AutoPocket(45.14, .6, extra=58.11, double_extra=True), AutoPocket(45.14, .6, extra=58.11, double_extra=True)
+    )
+    pent_unit = WireframeUnit(
+        1.58, AutoPocket(65.35, 1.5, extra=54, double_extra=False), AutoPocket(54, .6, extra=39.63, double_extra=False)
+    )
+    pent_connector_unit = WireframeUnit(
+        3.33, AutoPocket(39.63, .6, extra=65.35, double_extra=True), AutoPocket(39.63, .6, extra=65.35, double_extra=True)
+    )
+    unit_mm = 30
+    width = (210 - 5) / unit_mm
+    height = (297 - 5) / unit_mm
+    writer.write_svg(
+        "stackweave_t_22",
+        render_complex_sheet(
+            [tri_unit] * 4,
+            [tri_unit]*9,
+            min(width, 4 + tri_unit.length_ratio),
+            min(height, 1 + 3 * tri_unit.length_ratio), 
+            unit_mm * mm_ratio, #svg.mm(30),
+            extra_vertical_units=[([tri_unit] * 4, Vec(0, tri_unit.length_ratio * i)) for i in range(1, 3)],
+            extra_horizontal_units=[([tri_unit], Vec(0, tri_unit.length_ratio * 3))]
+        ),
+    )
+    writer.write_svg(
+        "stackweave_t_16",
+        render_complex_sheet(
+            [tri_unit] * 5,
+            [],
+            min(width, 4 + tri_unit.length_ratio),
+            min(height, 1 + 3 * tri_unit.length_ratio), 
+            unit_mm * mm_ratio, #svg.mm(30),
+            extra_vertical_units=[([tri_unit] * 5, Vec(0, tri_unit.length_ratio * i)) for i in range(1, 3)],
+            extra_horizontal_units=[([tri_unit], Vec(0, tri_unit.length_ratio * 3))]
+        ),
+    )
+    writer.write_svg(
+        "stackweave_t_connector",
+        render_complex_sheet(
+            [tri_connector_unit] * 2,
+            [tri_connector_unit] * 9,
+            min(width, 2 + tri_connector_unit.length_ratio),
+            min(height, 9), 
+            unit_mm * mm_ratio,
+            extra_vertical_units=[([tri_connector_unit] * 2, Vec(0, tri_connector_unit.length_ratio))]
+        ),
+    )
+    writer.write_svg(
+        "stackweave_t_connector_2",
+        render_complex_sheet(
+            [tri_connector_unit],
+            [] * 9,
+            min(width, 2 + tri_connector_unit.length_ratio),
+            min(height, 9), 
+            unit_mm * mm_ratio,
+            extra_vertical_units=[([tri_connector_unit], Vec(0, tri_connector_unit.length_ratio))]
+        ),
+    )
+    writer.write_svg(
+        "stackweave_p",
+        render_complex_sheet(
+            [pent_unit] * 6,
+            [],
+            min(width, 9999),
+            min(height, 9999), 
+            unit_mm * mm_ratio,
+            extra_vertical_units=[([pent_unit] * 6, Vec(0, pent_unit.length_ratio * i)) for i in range(1, 5)]
+        ),
+    )
+    writer.write_svg(
+        "stackweave_p_connector",
+        render_complex_sheet(
+            [pent_connector_unit] * 2,
+            [pent_connector_unit] * 9,
+            min(width*2, 2 + pent_connector_unit.length_ratio * 2),
+            min(height, 9), 
+            unit_mm * mm_ratio,
+            extra_vertical_units=[([pent_connector_unit] * 1, Vec(0, pent_connector_unit.length_ratio))],
+            extra_horizontal_units=[([pent_connector_unit] * 9, Vec(2 + pent_connector_unit.length_ratio * i, 0)) for i in range(0, 1)]
+        ),
+    )
+    writer.write_svg(
+        "stackweave_p_connector_2",
+        render_complex_sheet(
+            [],
+            [pent_connector_unit] * 9,
+            min(width*2, 2 + pent_connector_unit.length_ratio * 2),
+            min(height, 9), 
+            unit_mm * mm_ratio
+        ),
+    )
 
 
-with open("stackweave_t_22.svg", "w") as f_t_22:
-    with open("stackweave_t_16.svg", "w") as f_t_16:
-        with open("stackweave_t_connector.svg", "w") as f2:
-            with open("stackweave_t_connector_2.svg", "w") as f2b:
-                with open("stackweave_p.svg", "w") as f3:
-                    with open("stackweave_p_connector.svg", "w") as f4:
-                        with open("stackweave_p_connector_2.svg", "w") as f5:
-                            tri_unit = WireframeUnit(
-                                2.54, AutoPocket(30, 0.25, extra=45.14, double_extra=False), AutoPocket(58.11, .8, extra=30, double_extra=False)
-                            )
-                            tri_connector_unit = WireframeUnit(
-                                3.88, AutoPocket(45.14, .6, extra=58.11, double_extra=True), AutoPocket(45.14, .6, extra=58.11, double_extra=True)
-                            )
-                            pent_unit = WireframeUnit(
-                                1.58, AutoPocket(65.35, 1.5, extra=54, double_extra=False), AutoPocket(54, .6, extra=39.63, double_extra=False)
-                            )
-                            pent_connector_unit = WireframeUnit(
-                                3.33, AutoPocket(39.63, .6, extra=65.35, double_extra=True), AutoPocket(39.63, .6, extra=65.35, double_extra=True)
-                            )
-                            unit_mm = 30
-                            width = (210 - 5) / unit_mm
-                            height = (297 - 5) / unit_mm
-                            f_t_22.write(
-                                render_complex_sheet(
-                                    [tri_unit] * 4,
-                                    [tri_unit]*9,
-                                    min(width, 4 + tri_unit.length_ratio),
-                                    min(height, 1 + 3 * tri_unit.length_ratio), 
-                                    unit_mm * mm_ratio, #svg.mm(30),
-                                    extra_vertical_units=[([tri_unit] * 4, Vec(0, tri_unit.length_ratio * i)) for i in range(1, 3)],
-                                    extra_horizontal_units=[([tri_unit], Vec(0, tri_unit.length_ratio * 3))]
-                                ).as_str()
-                            )
-                            f_t_16.write(
-                                render_complex_sheet(
-                                    [tri_unit] * 5,
-                                    [],
-                                    min(width, 4 + tri_unit.length_ratio),
-                                    min(height, 1 + 3 * tri_unit.length_ratio), 
-                                    unit_mm * mm_ratio, #svg.mm(30),
-                                    extra_vertical_units=[([tri_unit] * 5, Vec(0, tri_unit.length_ratio * i)) for i in range(1, 3)],
-                                    extra_horizontal_units=[([tri_unit], Vec(0, tri_unit.length_ratio * 3))]
-                                ).as_str()
-                            )
-                            f2.write( 
-                                render_complex_sheet(
-                                    [tri_connector_unit] * 2,
-                                    [tri_connector_unit] * 9,
-                                    min(width, 2 + tri_connector_unit.length_ratio),
-                                    min(height, 9), 
-                                    unit_mm * mm_ratio,
-                                    extra_vertical_units=[([tri_connector_unit] * 2, Vec(0, tri_connector_unit.length_ratio))]
-                                ).as_str()
-                            )
-                            f2b.write( 
-                                render_complex_sheet(
-                                    [tri_connector_unit],
-                                    [] * 9,
-                                    min(width, 2 + tri_connector_unit.length_ratio),
-                                    min(height, 9), 
-                                    unit_mm * mm_ratio,
-                                    extra_vertical_units=[([tri_connector_unit], Vec(0, tri_connector_unit.length_ratio))]
-                                ).as_str()
-                            )
-                            f3.write( 
-                                render_complex_sheet(
-                                    [pent_unit] * 6,
-                                    [],
-                                    min(width, 9999),
-                                    min(height, 9999), 
-                                    unit_mm * mm_ratio,
-                                    extra_vertical_units=[([pent_unit] * 6, Vec(0, pent_unit.length_ratio * i)) for i in range(1, 5)]
-                                ).as_str()
-                            )
-                            f4.write( 
-                                render_complex_sheet(
-                                    [pent_connector_unit] * 2,
-                                    [pent_connector_unit] * 9,
-                                    min(width*2, 2 + pent_connector_unit.length_ratio * 2),
-                                    min(height, 9), 
-                                    unit_mm * mm_ratio,
-                                    extra_vertical_units=[([pent_connector_unit] * 1, Vec(0, pent_connector_unit.length_ratio))],
-                                    extra_horizontal_units=[([pent_connector_unit] * 9, Vec(2 + pent_connector_unit.length_ratio * i, 0)) for i in range(0, 1)]
-                                ).as_str()
-                            )
-                            f5.write( 
-                                render_complex_sheet(
-                                    [],
-                                    [pent_connector_unit] * 9,
-                                    min(width*2, 2 + pent_connector_unit.length_ratio * 2),
-                                    min(height, 9), 
-                                    unit_mm * mm_ratio
-                                ).as_str()
-                            )
-
-import pkgutil
-import importlib
-
-for loader, module_name, is_pkg in pkgutil.iter_modules(["models"]):
-    full_module_name = f"models.{module_name}"
-    module = importlib.import_module(full_module_name)    
-    module.write_files(ModelFileWriter(Path("output"), module_name))
+if __name__ == "__main__":
+    main()
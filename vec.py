@@ -1,64 +1,83 @@
 import math
-import svg
+import numpy
+from operator import itemgetter
 from typing import overload
-svg.Length.__neg__ = lambda self: svg.Length(-self.value, self.unit)
 
-class Vec:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
+_new = tuple.__new__
+
+
+class Vec(tuple):
+    """Immutable 2D point/vector. Equality and hashing are by value, so Vecs
+    can be used directly as dict keys and set members."""
+
+    __slots__ = ()
+
+    def __new__(cls, x, y):
+        return _new(cls, (x, y))
+
+    def __getnewargs__(self):
+        # Pickle and copy call __new__ with these rather than the tuple.
+        return (self.x, self.y)
+
+    x = property(itemgetter(0))
+    y = property(itemgetter(1))
 
     def copy(self) -> "Vec":
-        return Vec(self.x, self.y)
-    
+        return self
+
     @property
     def magnitude(self) -> float:
-        return math.sqrt(self.x * self.x + self.y * self.y)
-    
+        x, y = self
+        return math.sqrt(x * x + y * y)
+
     @property
     def normalised(self) -> "Vec":
         return self * (1 / self.magnitude)
-    
+
     def dot(self, other: "Vec") -> float:
         return self.x * other.x + self.y * other.y
-    
+
+    # Arithmetic unpacks the tuple and skips Vec.__new__, as these run for
+    # every point of every crease.
     def __neg__(self):
-        return Vec(-self.x, -self.y)
-    
-    
-    
+        x, y = self
+        return _new(Vec, (-x, -y))
+
     def __mul__(self, n: float) -> "Vec":
-        return Vec(self.x * n, self.y * n)
+        x, y = self
+        return _new(Vec, (x * n, y * n))
+
+    __rmul__ = __mul__
 
     def __add__(self, v: "Vec"):
-        return Vec(self.x + v.x, self.y + v.y)
+        x, y = self
+        vx, vy = v
+        return _new(Vec, (x + vx, y + vy))
 
     def __sub__(self, v: "Vec"):
-        return Vec(self.x - v.x, self.y - v.y)
+        x, y = self
+        vx, vy = v
+        return _new(Vec, (x - vx, y - vy))
 
-    def __div__(self, n: float | int):
-        return Vec(self.x / n, self.y / n)
+    def __truediv__(self, n: float | int):
+        x, y = self
+        return _new(Vec, (x / n, y / n))
 
-    @property
-    def length(self):
-        return math.sqrt(self.x * self.x + self.y * self.y)
+    length = magnitude
 
     def dist(self, v: "Vec") -> float:
         return (self - v).length
 
-    def __iter__(self):
-        yield self.x
-        yield self.y
+    def key(self, epsilon: float = 1e-9) -> tuple[int, int]:
+        """Coordinates snapped to a grid of size epsilon, for hashing points
+        that should match despite floating point noise. Points either side of
+        a grid line can still get different keys, so pick epsilon well above
+        the expected error."""
+        return (round(self.x / epsilon), round(self.y / epsilon))
 
-    def __getitem__(self, key):
-        if key == 0 or key == "x":
-            return self.x
-        if key == 1 or key == "y":
-            return self.y
-        raise IndexError
-    
-    def keys(self):
-        return ["x","y"]
+    def snapped(self, epsilon: float = 1e-9) -> "Vec":
+        x, y = self.key(epsilon)
+        return Vec(x * epsilon, y * epsilon)
 
     def __repr__(self):
         return f"({self.x}, {self.y})"
@@ -66,6 +85,10 @@ class Vec:
     # supports quick unpacking for svg funcs
     # Also supports readers thinking "why would you do this??"
 
+    @property
+    def xy(self):
+        return {"x": self.x, "y": self.y}
+
     @property
     def v1(self):
         return {"x1": self.x, "y1": self.y}
@@ -80,4 +103,92 @@ class Vec:
     
     @property
     def bla(self):
-        return Vec(f"{self.x.value}{self.x.unit}", f"{self.y.value}{self.y.unit}")
\ No newline at end of file
+        return Vec(f"{self.x.value}{self.x.unit}", f"{self.y.value}{self.y.unit}")
+
+
+class VecArray:
+    """N x 2 float array of points, supporting the same operations as Vec
+    but applied to every row at once."""
+
+    def __init__(self, data):
+        self.data = numpy.asarray(data, dtype=numpy.float64).reshape(-1, 2)
+
+    @classmethod
+    def from_vecs(cls, vecs) -> "VecArray":
+        return cls([(v.x, v.y) for v in vecs])
+
+    def to_vecs(self) -> list[Vec]:
+        return [Vec(x, y) for x, y in self.data.tolist()]
+
+    def copy(self) -> "VecArray":
+        return VecArray(self.data.copy())
+
+    @property
+    def x(self) -> numpy.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def y(self) -> numpy.ndarray:
+        return self.data[:, 1]
+
+    @property
+    def magnitude(self) -> numpy.ndarray:
+        return numpy.hypot(self.data[:, 0], self.data[:, 1])
+
+    length = magnitude
+
+    @property
+    def normalised(self) -> "VecArray":
+        return VecArray(self.data / self.magnitude[:, None])
+
+    def dot(self, other: "Vec | VecArray") -> numpy.ndarray:
+        if type(other) is Vec:
+            return self.data @ self._other(other)
+        return numpy.einsum("ij,ij->i", self.data, other.data)
+
+    def dist(self, other: "Vec | VecArray") -> numpy.ndarray:
+        return (self - other).length
+
+    def _other(self, other):
+        if type(other) is Vec:
+            return numpy.array([other.x, other.y], dtype=numpy.float64)
+        return other.data
+
+    def __neg__(self):
+        return VecArray(-self.data)
+
+    def __mul__(self, n) -> "VecArray":
+        n = numpy.asarray(n, dtype=numpy.float64)
+        return VecArray(self.data * (n[:, None] if n.ndim == 1 else n))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, n) -> "VecArray":
+        return self * (1 / numpy.asarray(n, dtype=numpy.float64))
+
+    def __add__(self, v: "Vec | VecArray"):
+        return VecArray(self.data + self._other(v))
+
+    __radd__ = __add__
+
+    def __sub__(self, v: "Vec | VecArray"):
+        return VecArray(self.data - self._other(v))
+
+    def __rsub__(self, v: Vec):
+        return VecArray(self._other(v) - self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        for x, y in self.data.tolist():
+            yield Vec(x, y)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return VecArray(self.data[key])
+        x, y = self.data[key].tolist()
+        return Vec(x, y)
+
+    def __repr__(self):
+        return f"VecArray({self.data.tolist()})"
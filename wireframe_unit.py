@@ -5,7 +5,9 @@ import svg
 
 from line import Line
 from matrix import Matrix, offset_by, rotate_around_point
+from render_cache import structural_hash
 from sheets import BaseUnit
+from tracing import element_count, traced
 from vec import Vec
 
 
@@ -27,13 +29,23 @@ class WireframeUnit(BaseUnit):
         self.name = name
         self.count = count
 
+    def structural_hash(self) -> str:
+        # name and count only label cheatsheets, they don't change the creases.
+        return structural_hash(
+            "WireframeUnit",
+            self.internal_length_ratio,
+            self.p1.structural_hash(),
+            self.p2.structural_hash(),
+        )
+
+    @traced(count=element_count)
     def render_elements(self, width, offset: Vec | Matrix, with_hints=False) -> List:
         t = offset if type(offset) is Matrix else offset_by(offset)
         height = self.height(width)
         verticals = [
             svg.Line(
                 class_=["valley"],
-                **(Line(t * Vec(width * x, svg.mm(0)), t * Vec(width * x, height))),
+                **(Line(t * Vec(width * x, 0), t * Vec(width * x, height))),
             )
             for x in [0.25, 0.5, 0.75]
         ]